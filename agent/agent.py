@@ -1,23 +1,47 @@
 import os
 from dotenv import load_dotenv
-from google.adk.tools import FunctionTool, agent_tool
+from google.adk.tools import FunctionTool
 from google.adk.agents.llm_agent import LlmAgent
+from google.adk.models.google_llm import Gemini
 from google.adk.models.lite_llm import LiteLlm
 
 from agent.prompts.peer_reviewer_prompt import PEER_REVIEWER_PROMPT
-from agent.tools import fetch_url_context, retrieve_source_context, get_current_datetime
+from agent.tools import (
+    fetch_url_context,
+    retrieve_source_context,
+    get_current_datetime,
+    run_in_thread_pool,
+)
 from agent.schemas import PeerReviewReport
+from agent.budget import (
+    budget_before_tool_callback,
+    budget_before_model_callback,
+    budget_after_model_callback,
+)
 from agent.sub_agents.google_search_agent import google_search_agent
+from agent.sub_agents.search_cache import CachedAgentTool
+from agent.models import ProviderRouter
+from agent.utils.logger import logger
 
 load_dotenv()
 
 
-def get_model():
-    model_provider = os.getenv("MODEL_PROVIDER", "").lower()
+def build_provider_model(model_provider: str, as_llm: bool = False):
+    """Model for one provider; `as_llm` wraps a bare Gemini model name in a BaseLlm.
 
-    if model_provider == "gemini" or not model_provider:
+    `<PROVIDER>_API_BASE` points a provider at another endpoint, such as a proxy
+    or the local stub in agent.models.stub_provider.
+    """
+    if model_provider == "gemini":
         gemini_model = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
-        return gemini_model
+        gemini_api_base = os.getenv("GEMINI_API_BASE")
+        if gemini_api_base:
+            return LiteLlm(
+                model=f"gemini/{gemini_model}",
+                api_base=gemini_api_base,
+                api_key=os.getenv("GOOGLE_API_KEY"),
+            )
+        return Gemini(model=gemini_model) if as_llm else gemini_model
 
     elif model_provider == "ollama":
         ollama_base_url = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
@@ -27,17 +51,45 @@ def get_model():
     elif model_provider == "openai":
         openai_model = os.getenv("OPENAI_MODEL", "gpt-4")
         openai_api_key = os.getenv("OPENAI_API_KEY")
-        return LiteLlm(model=openai_model, api_key=openai_api_key)
+        return LiteLlm(
+            model=openai_model,
+            api_key=openai_api_key,
+            api_base=os.getenv("OPENAI_API_BASE"),
+        )
 
     elif model_provider == "claude":
         claude_model = os.getenv("CLAUDE_MODEL", "claude-3-5-sonnet-20241022")
         anthropic_api_key = os.getenv("ANTHROPIC_API_KEY")
-        return LiteLlm(model=claude_model, api_key=anthropic_api_key)
+        if "/" not in claude_model:
+            # LiteLLM cannot infer the provider for model names missing from its cost map.
+            claude_model = f"anthropic/{claude_model}"
+        return LiteLlm(
+            model=claude_model,
+            api_key=anthropic_api_key,
+            api_base=os.getenv("ANTHROPIC_API_BASE"),
+        )
 
     else:
         raise ValueError(f"Unsupported MODEL_PROVIDER: {model_provider}")
 
 
+def get_model():
+    model_provider = os.getenv("MODEL_PROVIDER", "").lower() or "gemini"
+    fallbacks = [
+        name.strip().lower()
+        for name in os.getenv("MODEL_FALLBACKS", "").split(",")
+        if name.strip()
+    ]
+    if not fallbacks:
+        return build_provider_model(model_provider)
+
+    providers = list(dict.fromkeys([model_provider] + fallbacks))
+    logger.info(f"Routing model calls across providers: {', '.join(providers)}")
+    return ProviderRouter.from_providers(
+        [(name, build_provider_model(name, as_llm=True)) for name in providers]
+    )
+
+
 model = get_model()
 
 peer_review_agent = LlmAgent(
@@ -46,11 +98,14 @@ peer_review_agent = LlmAgent(
     description="An Expert Peer Reviewer, a highly experienced editor and fact-checker for professional technical and non-technical blog posts.",
     instruction=PEER_REVIEWER_PROMPT,
     tools=[
-        FunctionTool(fetch_url_context),
-        FunctionTool(retrieve_source_context),
+        FunctionTool(run_in_thread_pool(fetch_url_context)),
+        FunctionTool(run_in_thread_pool(retrieve_source_context)),
         FunctionTool(get_current_datetime),
-        agent_tool.AgentTool(google_search_agent),
+        CachedAgentTool(google_search_agent),
     ],
     include_contents="none",
     output_schema=PeerReviewReport,
+    before_tool_callback=budget_before_tool_callback,
+    before_model_callback=budget_before_model_callback,
+    after_model_callback=budget_after_model_callback,
 )
@@ -0,0 +1,155 @@
+import os
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from agent.utils.logger import logger
+
+BUDGET_EXHAUSTED_MESSAGE = (
+    "Review budget exhausted ({reason}). Do not call any more tools. "
+    "Produce the final peer review report now using the evidence gathered so far."
+)
+# ADK returns an output_schema agent's structured answer through this tool
+# when the agent also has other tools, so it is kept when those are removed.
+REPORT_TOOL_NAME = "set_model_response"
+TOOL_BUDGET_EXHAUSTED_MESSAGE = (
+    "Review budget exhausted ({reason}). Do not call {tool_name} again; "
+    "continue with the other tools or produce the final report."
+)
+
+
+def _parse_tool_limits(raw: str) -> Dict[str, int]:
+    limits = {}
+    for item in raw.split(","):
+        if "=" not in item:
+            continue
+        name, value = item.split("=", 1)
+        limits[name.strip()] = int(value)
+    return limits
+
+
+def _remove_tools(llm_request, keep: str = REPORT_TOOL_NAME) -> None:
+    """Drop every tool but `keep` from the request, so the model cannot call them."""
+    llm_request.tools_dict = {
+        name: tool for name, tool in llm_request.tools_dict.items() if name == keep
+    }
+    config = llm_request.config
+    if not config or not config.tools:
+        return
+    tools = []
+    for tool in config.tools:
+        declarations = [d for d in tool.function_declarations or [] if d.name == keep]
+        if declarations:
+            tools.append(tool.model_copy(update={"function_declarations": declarations}))
+    config.tools = tools or None
+
+
+class ReviewBudget:
+    """Per-review limits on tool calls, wall-clock time and model tokens.
+
+    A limit of 0 disables that check. Once any budget is hit the agent callbacks
+    short-circuit further tool calls; once a global one is hit, the model is also
+    left without tools and told to write its report.
+    """
+
+    def __init__(
+        self,
+        default_tool_limit: int = 8,
+        tool_limits: Optional[Dict[str, int]] = None,
+        max_seconds: float = 180,
+        max_tokens: int = 200_000,
+    ):
+        self.default_tool_limit = default_tool_limit
+        self.tool_limits = tool_limits or {}
+        self.max_seconds = max_seconds
+        self.max_tokens = max_tokens
+        self.started_at = time.monotonic()
+        self.tool_calls: Dict[str, int] = {}
+        self.tokens_used = 0
+        self.exhausted: List[str] = []
+
+    @classmethod
+    def from_env(cls) -> "ReviewBudget":
+        return cls(
+            default_tool_limit=int(os.getenv("REVIEW_TOOL_CALL_LIMIT", "8")),
+            tool_limits=_parse_tool_limits(os.getenv("REVIEW_TOOL_CALL_LIMITS", "")),
+            max_seconds=float(os.getenv("REVIEW_TIME_LIMIT_SECONDS", "180")),
+            max_tokens=int(os.getenv("REVIEW_TOKEN_LIMIT", "200000")),
+        )
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+
+    def _mark(self, reason: str) -> str:
+        if reason not in self.exhausted:
+            logger.warning(f"Review budget exhausted: {reason}")
+            self.exhausted.append(reason)
+        return reason
+
+    def check_global(self) -> Optional[str]:
+        if self.max_seconds and self.elapsed >= self.max_seconds:
+            return self._mark(f"time: {self.max_seconds:g}s")
+        if self.max_tokens and self.tokens_used >= self.max_tokens:
+            return self._mark(f"tokens: {self.max_tokens}")
+        return None
+
+    def consume_tool_call(self, tool_name: str) -> Optional[str]:
+        """Count a tool call, returning the exhausted budget if it must not run."""
+        limit = self.tool_limits.get(tool_name, self.default_tool_limit)
+        used = self.tool_calls.get(tool_name, 0)
+        if limit and used >= limit:
+            return self._mark(f"tool_calls[{tool_name}]: {limit}")
+        self.tool_calls[tool_name] = used + 1
+        return None
+
+    def record_tokens(self, count: int) -> None:
+        self.tokens_used += count
+
+
+current_budget: ContextVar[Optional[ReviewBudget]] = ContextVar(
+    "current_budget", default=None
+)
+
+
+def budget_before_tool_callback(tool, args, tool_context) -> Optional[Dict[str, Any]]:
+    budget = current_budget.get()
+    # Delivering the report is what an exhausted budget asks for; never block it.
+    if budget is None or tool.name == REPORT_TOOL_NAME:
+        return None
+
+    reason = budget.check_global()
+    if reason:
+        return {"result": BUDGET_EXHAUSTED_MESSAGE.format(reason=reason)}
+
+    reason = budget.consume_tool_call(tool.name)
+    if reason:
+        return {
+            "result": TOOL_BUDGET_EXHAUSTED_MESSAGE.format(
+                reason=reason, tool_name=tool.name
+            )
+        }
+    return None
+
+
+def budget_before_model_callback(callback_context, llm_request):
+    budget = current_budget.get()
+    if budget is None:
+        return None
+
+    reason = budget.check_global()
+    if reason:
+        _remove_tools(llm_request)
+        llm_request.append_instructions([BUDGET_EXHAUSTED_MESSAGE.format(reason=reason)])
+    return None
+
+
+def budget_after_model_callback(callback_context, llm_response):
+    budget = current_budget.get()
+    if budget is None:
+        return None
+
+    usage = getattr(llm_response, "usage_metadata", None)
+    if usage and usage.total_token_count:
+        budget.record_tokens(usage.total_token_count)
+    return None
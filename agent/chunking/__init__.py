@@ -0,0 +1,7 @@
+from agent.chunking.splitter import (
+    StructureAwareTextSplitter,
+    split_sentences,
+    token_length_function,
+)
+
+__all__ = ["StructureAwareTextSplitter", "split_sentences", "token_length_function"]
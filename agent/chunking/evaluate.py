@@ -0,0 +1,171 @@
+"""Evaluate chunking settings: retrieval quality against index size and ingest time.
+
+Run with:
+
+    python -m agent.chunking.evaluate --corpus path/to/sources --queries queries.jsonl
+
+`--corpus` is a directory of .md/.markdown/.txt files. `--queries` is optional
+JSONL, one `{"query": "...", "answer": "..."}` per line, where a hit means a
+retrieved chunk contains `answer` (case and whitespace insensitive). Without
+it, sentences are sampled from the corpus and must retrieve their own chunk.
+For each configuration the harness reports chunk count, indexed tokens, index
+size on disk, ingest time, hit@k and MRR, with the old 800/200-character
+recursive splitter as a baseline.
+"""
+
+import argparse
+import json
+import random
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from langchain_huggingface import HuggingFaceEmbeddings
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from agent.chunking.splitter import (
+    StructureAwareTextSplitter,
+    split_sentences,
+    token_length_function,
+)
+from agent.source_manager import MARKDOWN_EXTENSIONS
+from agent.vector_stores.numpy_backend import NumpyIndexBackend
+
+Query = Tuple[str, str]
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def load_corpus(directory: str) -> Dict[str, str]:
+    return {
+        path.name: path.read_text(encoding="utf-8")
+        for path in sorted(Path(directory).rglob("*"))
+        if path.suffix.lower() in MARKDOWN_EXTENSIONS + (".txt",)
+    }
+
+
+def load_queries(path: str) -> List[Query]:
+    with open(path, encoding="utf-8") as f:
+        return [
+            (item["query"], item["answer"])
+            for item in (json.loads(line) for line in f if line.strip())
+        ]
+
+
+def sample_queries(corpus: Dict[str, str], count: int, seed: int = 0) -> List[Query]:
+    sentences = [
+        sentence
+        for text in corpus.values()
+        for sentence in split_sentences(text)
+        if len(sentence.split()) >= 8 and "```" not in sentence
+    ]
+    random.Random(seed).shuffle(sentences)
+    return [(sentence, sentence) for sentence in sentences[:count]]
+
+
+def evaluate(
+    splitters: Tuple,
+    corpus: Dict[str, str],
+    queries: List[Query],
+    embeddings: HuggingFaceEmbeddings,
+    token_length,
+    k: int,
+) -> Dict[str, float]:
+    markdown_splitter, plain_splitter = splitters
+    directory = tempfile.mkdtemp()
+    try:
+        started = time.perf_counter()
+        texts: List[str] = []
+        for source_name, content in corpus.items():
+            splitter = (
+                markdown_splitter
+                if source_name.lower().endswith(MARKDOWN_EXTENSIONS)
+                else plain_splitter
+            )
+            texts.extend(splitter.split_text(content))
+        backend = NumpyIndexBackend(directory, "chunking_eval")
+        backend.add(
+            ids=[str(i) for i in range(len(texts))],
+            texts=texts,
+            embeddings=embeddings.embed_documents(texts),
+            metadatas=[{} for _ in texts],
+        )
+        ingest_seconds = time.perf_counter() - started
+
+        results = backend.search_batch(embeddings.embed_documents([q for q, _ in queries]), k=k)
+        hits, reciprocal_ranks = 0, 0.0
+        for (_, answer), records in zip(queries, results):
+            answer = _normalize(answer)
+            for rank, record in enumerate(records, start=1):
+                if answer in _normalize(record.text):
+                    hits += 1
+                    reciprocal_ranks += 1 / rank
+                    break
+
+        index_bytes = sum(f.stat().st_size for f in Path(directory).rglob("*") if f.is_file())
+        return {
+            "chunks": len(texts),
+            "indexed_tokens": sum(token_length(t) for t in texts),
+            "index_mb": index_bytes / 1024 / 1024,
+            "ingest_s": ingest_seconds,
+            f"hit@{k}": hits / len(queries),
+            "mrr": reciprocal_ranks / len(queries),
+        }
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", required=True)
+    parser.add_argument("--queries")
+    parser.add_argument("--sample-queries", type=int, default=200)
+    parser.add_argument("--chunk-sizes", type=int, nargs="+", default=[128, 200, 254])
+    parser.add_argument("--overlaps", type=int, nargs="+", default=[0, 20, 50])
+    parser.add_argument("--k", type=int, default=5)
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    if not corpus:
+        parser.error(f"No .md/.markdown/.txt files found under {args.corpus}")
+    queries = (
+        load_queries(args.queries)
+        if args.queries
+        else sample_queries(corpus, args.sample_queries)
+    )
+
+    embeddings = HuggingFaceEmbeddings(
+        model_name="all-MiniLM-L6-v2",
+        model_kwargs={"device": "cpu"},
+        encode_kwargs={"normalize_embeddings": True},
+    )
+    token_length, max_tokens = token_length_function(embeddings)
+
+    recursive = RecursiveCharacterTextSplitter(chunk_size=800, chunk_overlap=200)
+    configs = {"recursive-800c/200c": (recursive, recursive)}
+    for size in args.chunk_sizes:
+        for overlap in args.overlaps:
+            if overlap >= size:
+                continue
+            kwargs = dict(
+                chunk_size=min(size, max_tokens),
+                chunk_overlap=overlap,
+                length_function=token_length,
+            )
+            configs[f"structure-{size}t/{overlap}t"] = (
+                StructureAwareTextSplitter(markdown=True, **kwargs),
+                StructureAwareTextSplitter(markdown=False, **kwargs),
+            )
+
+    print(f"{len(corpus)} documents, {len(queries)} queries")
+    for name, splitters in configs.items():
+        metrics = evaluate(splitters, corpus, queries, embeddings, token_length, args.k)
+        print(name + "  " + "  ".join(f"{key}={value:.3f}" for key, value in metrics.items()))
+
+
+if __name__ == "__main__":
+    main()
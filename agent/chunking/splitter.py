@@ -0,0 +1,230 @@
+import re
+from typing import Callable, Iterator, List, Tuple
+
+from langchain_text_splitters import TextSplitter
+
+_HEADING = re.compile(r"^(#{1,6})\s+\S")
+_FENCE = re.compile(r"^\s*(```|~~~)")
+_LIST_ITEM = re.compile(r"^\s*([-*+]|\d+[.)])\s+\S")
+_TABLE_ROW = re.compile(r"^\s*\|")
+_TABLE_SEPARATOR = re.compile(r"^\s*\|?\s*:?-{3,}")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+(?=[\"'(\[A-Z0-9])")
+
+# (kind, text) where kind is "prose", "code", "list" or "table"; list and
+# table blocks keep their line breaks.
+Block = Tuple[str, str]
+
+
+def token_length_function(embeddings) -> Tuple[Callable[[str], int], int]:
+    """Build a token counter for a HuggingFaceEmbeddings model.
+
+    Returns the counter and the model's max sequence length; text beyond that
+    length is truncated by the model, so chunks must not exceed it. Falls back
+    to a ~4 characters per token estimate when no tokenizer is available.
+    """
+    client = getattr(embeddings, "_client", None)
+    tokenizer = getattr(client, "tokenizer", None)
+    max_tokens = getattr(client, "max_seq_length", None) or 256
+    if tokenizer is None:
+        return (lambda text: max(1, len(text) // 4)), max_tokens
+
+    def count(text: str) -> int:
+        return len(tokenizer.encode(text, add_special_tokens=False))
+
+    # Leave room for the [CLS]/[SEP] tokens the model adds.
+    return count, max_tokens - 2
+
+
+def split_sentences(text: str) -> List[str]:
+    return [s for s in _SENTENCE_END.split(" ".join(text.split())) if s]
+
+
+class StructureAwareTextSplitter(TextSplitter):
+    """Split Markdown or plain text along its structure, sized by `length_function`.
+
+    Chunks never cross a heading, and every chunk starts with its section's
+    heading path (the heading and its parent headings). A heading with neither
+    body nor subsections becomes a chunk of its own. Fenced code blocks are kept
+    whole where they fit, or split on line boundaries with the fence repeated.
+    Lists and tables keep their line breaks and split on line boundaries, with
+    a table's header rows repeated. Prose is packed by paragraph, falling back
+    to sentences and then words for oversized units.
+    Overlap carries whole trailing sentences, up to `chunk_overlap`, into the
+    next chunk of the same section.
+    """
+
+    def __init__(self, markdown: bool = True, **kwargs):
+        super().__init__(**kwargs)
+        self.markdown = markdown
+
+    def split_text(self, text: str) -> List[str]:
+        chunks = []
+        for heading, blocks in self._sections(text):
+            if blocks:
+                chunks.extend(self._pack(heading, blocks))
+            else:
+                chunks.append(heading)
+        return chunks
+
+    def _sections(self, text: str) -> Iterator[Tuple[str, List[Block]]]:
+        """Yield (heading path, blocks) per section; blocks are empty for a
+        heading that has neither body nor subsections."""
+        headings: List[Tuple[int, str]] = []  # (level, heading line), outermost first
+        blocks: List[Block] = []
+        paragraph: List[str] = []
+        code: List[str] = []
+        fence = None
+
+        def heading_path() -> str:
+            return "\n".join(line for _, line in headings)
+
+        def flush_paragraph():
+            if not paragraph:
+                return
+            if _TABLE_ROW.match(paragraph[0]):
+                blocks.append(("table", "\n".join(line.rstrip() for line in paragraph)))
+            elif any(_LIST_ITEM.match(line) for line in paragraph):
+                # Keep indentation, so nested items stay nested.
+                blocks.append(("list", "\n".join(line.rstrip() for line in paragraph)))
+            else:
+                blocks.append(("prose", " ".join(line.strip() for line in paragraph)))
+            paragraph.clear()
+
+        for line in text.splitlines():
+            if fence:
+                code.append(line)
+                if line.strip().startswith(fence):
+                    blocks.append(("code", "\n".join(code)))
+                    code, fence = [], None
+                continue
+
+            fence_match = _FENCE.match(line) if self.markdown else None
+            heading_match = _HEADING.match(line) if self.markdown else None
+            if fence_match:
+                flush_paragraph()
+                fence, code = fence_match.group(1), [line]
+            elif heading_match:
+                flush_paragraph()
+                level = len(heading_match.group(1))
+                # A heading without body is only dropped when subsections follow,
+                # which carry it in their heading path.
+                if blocks or (headings and level <= headings[-1][0]):
+                    yield heading_path(), blocks
+                while headings and headings[-1][0] >= level:
+                    headings.pop()
+                headings.append((level, line.strip()))
+                blocks = []
+            elif not line.strip():
+                flush_paragraph()
+            else:
+                paragraph.append(line)
+
+        flush_paragraph()
+        if code:
+            blocks.append(("code", "\n".join(code)))
+        if blocks or headings:
+            yield heading_path(), blocks
+
+    def _split_words(self, text: str, budget: int) -> List[str]:
+        pieces, current = [], []
+        for word in text.split():
+            if current and self._length_function(" ".join(current + [word])) > budget:
+                pieces.append(" ".join(current))
+                current = []
+            current.append(word)
+        if current:
+            pieces.append(" ".join(current))
+        return pieces
+
+    def _split_code(self, code: str, budget: int) -> List[str]:
+        lines = code.splitlines()
+        opening = lines[0]
+        has_closing = len(lines) > 1 and _FENCE.match(lines[-1])
+        closing = lines[-1] if has_closing else opening.strip()[:3]
+        body = lines[1:-1] if has_closing else lines[1:]
+        return self._split_lines(body, budget, [opening], [closing])
+
+    def _split_table(self, table: str, budget: int) -> List[str]:
+        lines = table.splitlines()
+        has_header = len(lines) > 2 and _TABLE_SEPARATOR.match(lines[1])
+        header = lines[:2] if has_header else []
+        return self._split_lines(lines[len(header):], budget, header, [])
+
+    def _split_lines(
+        self, lines: List[str], budget: int, head: List[str], tail: List[str]
+    ) -> List[str]:
+        """Pack lines into pieces, each wrapped in `head` and `tail` lines."""
+        overhead = self._length_function("\n".join(head + tail)) if head or tail else 0
+        pieces, current = [], []
+        for line in lines:
+            candidate = "\n".join(current + [line])
+            if current and self._length_function(candidate) + overhead > budget:
+                pieces.append("\n".join(head + current + tail))
+                current = []
+            current.append(line)
+        if current:
+            pieces.append("\n".join(head + current + tail))
+        return pieces
+
+    def _units(self, blocks: List[Block], budget: int) -> List[Block]:
+        units: List[Block] = []
+        for kind, text in blocks:
+            if not text.strip():
+                continue
+            if self._length_function(text) <= budget:
+                units.append((kind, text))
+            elif kind == "code":
+                units.extend(("code", piece) for piece in self._split_code(text, budget))
+            elif kind == "table":
+                units.extend(("table", piece) for piece in self._split_table(text, budget))
+            elif kind == "list":
+                units.extend(
+                    ("list", piece)
+                    for piece in self._split_lines(text.splitlines(), budget, [], [])
+                )
+            else:
+                for sentence in split_sentences(text):
+                    if self._length_function(sentence) <= budget:
+                        units.append(("prose", sentence))
+                    else:
+                        units.extend(
+                            ("prose", piece) for piece in self._split_words(sentence, budget)
+                        )
+        return units
+
+    def _overlap(self, parts: List[Block]) -> List[Block]:
+        if not self._chunk_overlap or not parts or parts[-1][0] != "prose":
+            return []
+        carried: List[str] = []
+        for sentence in reversed(split_sentences(parts[-1][1])):
+            if self._length_function(" ".join([sentence] + carried)) > self._chunk_overlap:
+                break
+            carried.insert(0, sentence)
+        return [("prose", " ".join(carried))] if carried else []
+
+    def _pack(self, heading: str, blocks: List[Block]) -> List[str]:
+        heading_length = self._length_function(heading) if heading else 0
+        budget = max(1, self._chunk_size - heading_length)
+
+        chunks: List[str] = []
+        parts: List[Block] = []
+        length = 0
+
+        def emit():
+            body = "\n\n".join(text for _, text in parts)
+            chunks.append(f"{heading}\n\n{body}" if heading else body)
+
+        for kind, text in self._units(blocks, budget):
+            unit_length = self._length_function(text)
+            if parts and length + unit_length > budget:
+                emit()
+                parts = self._overlap(parts)
+                length = sum(self._length_function(t) for _, t in parts)
+                if length + unit_length > budget:
+                    parts, length = [], 0
+            parts.append((kind, text))
+            length += unit_length
+
+        if parts:
+            emit()
+        return chunks
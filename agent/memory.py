@@ -1,9 +1,11 @@
 import os
 import json
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Union
 from mem0 import Memory
 from dotenv import load_dotenv
 
+from agent.sharding import ShardRouter
+from agent.store_service import STORE_SERVICE_SOCKET, RemoteMemoryManager, get_remote_manager
 from agent.utils.logger import logger
 
 load_dotenv()
@@ -11,15 +13,21 @@ load_dotenv()
 os.environ["OPENAI_API_KEY"] = "NONE"
 os.environ["PYTORCH_ENABLE_MPS_FALLBACK"] = "1"
 
+MEMORY_STORE_PATH = "agent/memory_store"
+MEMORY_COLLECTION = "peer_review_memory"
+
 
 class MemoryManager:
-    def __init__(self):
+    def __init__(self, store_path: str = MEMORY_STORE_PATH):
+        self.store_path = store_path
+        self.chroma_path = f"{store_path}/chroma"
+        self.history_db_path = f"{store_path}/history.db"
         config = {
             "vector_store": {
                 "provider": "chroma",
                 "config": {
-                    "collection_name": "peer_review_memory",
-                    "path": "agent/memory_store/chroma",
+                    "collection_name": MEMORY_COLLECTION,
+                    "path": self.chroma_path,
                 },
             },
             "embedder": {
@@ -38,12 +46,12 @@ class MemoryManager:
                     "top_p": 0.7,
                 },
             },
-            "history_store_path": "agent/memory_store/history.db",
+            "history_store_path": self.history_db_path,
         }
 
         try:
             logger.info(
-                "Initializing MemoryManager with ChromaDB and HuggingFace Embeddings"
+                f"Initializing MemoryManager with ChromaDB and HuggingFace Embeddings at {store_path}"
             )
             self.memory = Memory.from_config(config)
         except Exception as e:
@@ -58,7 +66,7 @@ class MemoryManager:
 
     def get_blog_history(self, blog_id: str) -> List[Dict[str, Any]]:
         try:
-            logger.debug(f"Fetching history for blog_id: {blog_id}")
+            logger.debug("Fetching history for blog_id: %s", blog_id)
             history = self.memory.get_all(user_id=blog_id)
             if isinstance(history, dict) and "results" in history:
                 history = history["results"]
@@ -69,7 +77,7 @@ class MemoryManager:
 
     def store_review(self, blog_id: str, content: str, feedback: Any) -> None:
         try:
-            logger.debug(f"Storing review for blog_id: {blog_id}")
+            logger.debug("Storing review for blog_id: %s", blog_id)
             if hasattr(feedback, "model_dump_json"):
                 feedback_str = feedback.model_dump_json()
             elif isinstance(feedback, dict):
@@ -89,3 +97,20 @@ class MemoryManager:
             logger.info(f"Successfully stored review for {blog_id}")
         except Exception as e:
             logger.error(f"Error storing review for blog_id {blog_id}: {e}")
+
+
+memory_router: ShardRouter[MemoryManager] = ShardRouter.from_env(
+    "MEMORY_SHARDS", MEMORY_STORE_PATH, MemoryManager
+)
+
+
+def get_memory_manager(
+    blog_id: Optional[str] = None,
+) -> Union[MemoryManager, RemoteMemoryManager]:
+    """Return the MemoryManager for blog_id's shard, loading it on first use.
+
+    With STORE_SERVICE_SOCKET set, the store service owns the shards instead.
+    """
+    if STORE_SERVICE_SOCKET:
+        return get_remote_manager("memory")
+    return memory_router.get(blog_id)
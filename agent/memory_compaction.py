@@ -0,0 +1,313 @@
+"""Compact the mem0 review memory store.
+
+Run with:
+
+    python -m agent.memory_compaction [--blog-id ID ...] [--dry-run]
+
+For each blog_id (by default every blog_id found in the store) the job:
+
+1. drops memories older than MEMORY_RETENTION_DAYS,
+2. removes exact duplicates and near-duplicates (cosine similarity at least
+   MEMORY_DUPLICATE_THRESHOLD), keeping the newest as it supersedes the rest,
+3. rolls memories older than MEMORY_SUMMARIZE_AFTER_DAYS, and any beyond
+   MEMORY_MAX_PER_BLOG, together with earlier summaries into a single summary
+   memory. Long histories are folded in prompt-sized chunks, and only
+   memories that made it into a successful LLM call are deleted.
+
+It then prunes history rows of deleted memories, vacuums history.db, and
+prints before/after store sizes and get_all/search latency.
+"""
+
+import os
+import time
+import sqlite3
+import argparse
+from pathlib import Path
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from agent.memory import (
+    MemoryManager,
+    get_memory_manager,
+    memory_router,
+)
+from agent.utils.logger import logger
+
+MEMORY_RETENTION_DAYS = int(os.getenv("MEMORY_RETENTION_DAYS", "365"))
+MEMORY_SUMMARIZE_AFTER_DAYS = int(os.getenv("MEMORY_SUMMARIZE_AFTER_DAYS", "90"))
+MEMORY_MAX_PER_BLOG = int(os.getenv("MEMORY_MAX_PER_BLOG", "200"))
+MEMORY_DUPLICATE_THRESHOLD = float(os.getenv("MEMORY_DUPLICATE_THRESHOLD", "0.95"))
+SUMMARY_MAX_INPUT_CHARS = 12000
+
+SUMMARY_PROMPT = """You maintain the review history of a blog project for a peer reviewer.
+Condense the following past review notes into a short list of recurring issues,
+resolved issues and notable patterns. Keep concrete details (claims, sections,
+dates) that a future reviewer would need. Output plain text only."""
+
+
+def _parse_time(value: Optional[str]) -> datetime:
+    if not value:
+        return datetime.fromtimestamp(0, tz=timezone.utc)
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _note(memory: Dict[str, Any]) -> str:
+    return f"- [{(memory.get('created_at') or '')[:10]}] {memory['memory']}"
+
+
+def _is_summary(memory: Dict[str, Any]) -> bool:
+    return (memory.get("metadata") or {}).get("type") == "summary"
+
+
+def _summary_bound(memory: Dict[str, Any], key: str) -> datetime:
+    """Start ("from") or end ("to") of the period a memory or summary covers."""
+    if _is_summary(memory) and (memory.get("metadata") or {}).get(key):
+        return _parse_time(memory["metadata"][key])
+    return _parse_time(memory.get("created_at"))
+
+
+def _directory_size(path: str) -> int:
+    root = Path(path)
+    if root.is_file():
+        return root.stat().st_size
+    return sum(f.stat().st_size for f in root.rglob("*") if f.is_file())
+
+
+class MemoryCompactor:
+    def __init__(self, memory_manager: MemoryManager, dry_run: bool = False):
+        self.memory = memory_manager.memory
+        self.chroma_path = memory_manager.chroma_path
+        self.history_db_path = memory_manager.history_db_path
+        self.dry_run = dry_run
+        self.deleted_ids: List[str] = []
+
+    def list_blog_ids(self) -> List[str]:
+        # Go through the collection mem0 already opened: a second chromadb
+        # client on the same path with other settings is refused by chromadb.
+        collection = self.memory.vector_store.collection
+        metadatas = collection.get(include=["metadatas"])["metadatas"] or []
+        return sorted({meta["user_id"] for meta in metadatas if meta and meta.get("user_id")})
+
+    def _memories(self, blog_id: str) -> List[Dict[str, Any]]:
+        result = self.memory.get_all(user_id=blog_id, limit=100000)
+        if isinstance(result, dict) and "results" in result:
+            result = result["results"]
+        return sorted(
+            result,
+            key=lambda m: _parse_time(m.get("updated_at") or m.get("created_at")),
+            reverse=True,
+        )
+
+    def _delete(self, memories: List[Dict[str, Any]], reason: str) -> None:
+        for item in memories:
+            logger.debug("Deleting memory %s (%s)", item["id"], reason)
+            if not self.dry_run:
+                self.memory.delete(item["id"])
+            self.deleted_ids.append(item["id"])
+
+    def _duplicates(self, memories: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Return memories superseded by a newer one; `memories` is newest first."""
+        seen_hashes = set()
+        unique, duplicates = [], []
+        for item in memories:
+            key = item.get("hash") or " ".join(item["memory"].lower().split())
+            if key in seen_hashes:
+                duplicates.append(item)
+            else:
+                seen_hashes.add(key)
+                unique.append(item)
+
+        if len(unique) < 2:
+            return duplicates
+        vectors = np.array(
+            [self.memory.embedding_model.embed(item["memory"]) for item in unique],
+            dtype=np.float32,
+        )
+        vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        similarity = vectors @ vectors.T
+        kept: List[int] = []
+        for i, item in enumerate(unique):
+            if any(similarity[i, j] >= MEMORY_DUPLICATE_THRESHOLD for j in kept):
+                duplicates.append(item)
+            else:
+                kept.append(i)
+        return duplicates
+
+    def _fold(self, summary: str, memories: List[Dict[str, Any]]) -> Optional[str]:
+        """Fold `memories` (oldest first) into `summary`; None if the LLM call fails."""
+        notes = "\n".join(_note(m) for m in memories)
+        if summary:
+            notes = f"Existing summary:\n{summary}\n\nNew notes:\n{notes}"
+        if self.dry_run:
+            return summary or notes
+        try:
+            return self.memory.llm.generate_response(
+                messages=[
+                    {"role": "system", "content": SUMMARY_PROMPT},
+                    {"role": "user", "content": notes},
+                ]
+            )
+        except Exception as e:
+            logger.warning(f"LLM summary failed, keeping the remaining memories: {e}")
+            return None
+
+    def _summarize(
+        self, memories: List[Dict[str, Any]]
+    ) -> Tuple[Optional[str], List[Dict[str, Any]]]:
+        """Roll `memories` (oldest first) into one summary, a prompt-sized chunk at a time.
+
+        Returns the summary and the memories it covers. Only those may be
+        deleted; the rest (after a failed LLM call, or a memory too long to
+        share a prompt with the running summary) are kept for a later run.
+        """
+        summary, folded, chunk, size = "", [], [], 0
+        for item in memories:
+            note_size = len(_note(item)) + 1
+            if note_size > SUMMARY_MAX_INPUT_CHARS // 2:
+                logger.warning(f"Memory {item['id']} too long to summarize, keeping it")
+                continue
+            if chunk and len(summary) + size + note_size > SUMMARY_MAX_INPUT_CHARS:
+                folded_summary = self._fold(summary, chunk)
+                if folded_summary is None:
+                    return summary or None, folded
+                summary, folded, chunk, size = folded_summary, folded + chunk, [], 0
+            chunk.append(item)
+            size += note_size
+        if chunk and (folded_summary := self._fold(summary, chunk)) is not None:
+            summary, folded = folded_summary, folded + chunk
+        return summary or None, folded
+
+    def compact_blog(self, blog_id: str, now: Optional[datetime] = None) -> Dict[str, int]:
+        now = now or datetime.now(timezone.utc)
+        memories = self._memories(blog_id)
+        stats = {"before": len(memories), "expired": 0, "duplicates": 0, "summarized": 0}
+
+        expired = [
+            m for m in memories
+            if now - _parse_time(m.get("created_at")) > timedelta(days=MEMORY_RETENTION_DAYS)
+        ]
+        self._delete(expired, "retention")
+        stats["expired"] = len(expired)
+        expired_ids = {m["id"] for m in expired}
+        memories = [m for m in memories if m["id"] not in expired_ids]
+
+        duplicates = self._duplicates(memories)
+        self._delete(duplicates, "duplicate")
+        stats["duplicates"] = len(duplicates)
+        duplicate_ids = {m["id"] for m in duplicates}
+        memories = [m for m in memories if m["id"] not in duplicate_ids]
+
+        summaries = [m for m in memories if _is_summary(m)]
+        candidates = [m for m in memories if not _is_summary(m)]
+        aged_ids = {
+            m["id"] for m in candidates
+            if now - _parse_time(m.get("created_at")) > timedelta(days=MEMORY_SUMMARIZE_AFTER_DAYS)
+        }
+        # All summaries merge into one, so leave room for exactly one within the cap.
+        over_cap_ids = {m["id"] for m in candidates[MEMORY_MAX_PER_BLOG - 1:]}
+        to_summarize = [m for m in candidates if m["id"] in aged_ids | over_cap_ids]
+
+        if len(to_summarize) + len(summaries) > 1:
+            # Oldest first, with earlier summaries ahead of the notes they precede.
+            ordered = list(reversed(summaries)) + list(reversed(to_summarize))
+            summary, folded = self._summarize(ordered)
+            folded_memories = [m for m in folded if not _is_summary(m)]
+            if summary and len(folded) > 1:
+                covered = sum(
+                    (m.get("metadata") or {}).get("covers", 1) if _is_summary(m) else 1
+                    for m in folded
+                )
+                oldest = min(_summary_bound(m, "from") for m in folded)
+                newest = max(_summary_bound(m, "to") for m in folded)
+                if not self.dry_run:
+                    self.memory.add(
+                        summary,
+                        user_id=blog_id,
+                        metadata={
+                            "source": "memory_compaction",
+                            "type": "summary",
+                            "covers": covered,
+                            "from": oldest.isoformat(),
+                            "to": newest.isoformat(),
+                        },
+                        infer=False,
+                    )
+                self._delete(folded, "summarized")
+                stats["summarized"] = len(folded_memories)
+                folded_ids = {m["id"] for m in folded}
+                memories = [m for m in memories if m["id"] not in folded_ids]
+                memories.append({"id": "summary"})
+
+        stats["after"] = len(memories)
+        logger.info(f"Compacted memory for {blog_id}: {stats}")
+        return stats
+
+    def vacuum_history(self) -> None:
+        if self.dry_run or not Path(self.history_db_path).exists():
+            return
+        connection = sqlite3.connect(self.history_db_path)
+        try:
+            for start in range(0, len(self.deleted_ids), 500):
+                batch = self.deleted_ids[start:start + 500]
+                connection.execute(
+                    f"DELETE FROM history WHERE memory_id IN ({','.join('?' * len(batch))})",
+                    batch,
+                )
+            connection.commit()
+            connection.execute("VACUUM")
+        finally:
+            connection.close()
+
+    def measure(self, blog_ids: List[str]) -> Dict[str, float]:
+        get_all_ms, search_ms = [], []
+        for blog_id in blog_ids:
+            started = time.perf_counter()
+            self.memory.get_all(user_id=blog_id)
+            get_all_ms.append((time.perf_counter() - started) * 1000)
+            started = time.perf_counter()
+            self.memory.search("recurring issues", user_id=blog_id)
+            search_ms.append((time.perf_counter() - started) * 1000)
+        return {
+            "chroma_mb": _directory_size(self.chroma_path) / 1024 / 1024,
+            "history_mb": _directory_size(self.history_db_path) / 1024 / 1024
+            if Path(self.history_db_path).exists() else 0.0,
+            "get_all_ms": float(np.mean(get_all_ms)) if get_all_ms else 0.0,
+            "search_ms": float(np.mean(search_ms)) if search_ms else 0.0,
+        }
+
+    def run(self, blog_ids: Optional[List[str]] = None) -> Dict[str, Any]:
+        blog_ids = blog_ids or self.list_blog_ids()
+        before = self.measure(blog_ids)
+        per_blog = {blog_id: self.compact_blog(blog_id) for blog_id in blog_ids}
+        self.vacuum_history()
+        after = self.measure(blog_ids)
+        return {"before": before, "after": after, "blogs": per_blog}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--blog-id", action="append", dest="blog_ids")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    if args.blog_ids:
+        jobs = [(get_memory_manager(blog_id), [blog_id]) for blog_id in args.blog_ids]
+    else:
+        # The default store plus every dedicated shard, each over all its blog_ids.
+        paths = [memory_router.default_path] + sorted(set(memory_router.shard_map.values()))
+        jobs = [(memory_router.get_path(path), None) for path in paths]
+
+    for memory_manager, blog_ids in jobs:
+        print(f"== {memory_manager.store_path}")
+        report = MemoryCompactor(memory_manager, dry_run=args.dry_run).run(blog_ids)
+        for blog_id, stats in report["blogs"].items():
+            print(f"{blog_id}: " + ", ".join(f"{k}={v}" for k, v in stats.items()))
+        for key in report["before"]:
+            print(f"{key}: {report['before'][key]:.2f} -> {report['after'][key]:.2f}")
+
+
+if __name__ == "__main__":
+    main()
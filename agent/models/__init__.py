@@ -0,0 +1,3 @@
+from agent.models.router import CircuitBreaker, LatencyStats, ProviderRouter
+
+__all__ = ["CircuitBreaker", "LatencyStats", "ProviderRouter"]
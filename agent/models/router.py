@@ -0,0 +1,287 @@
+import os
+import time
+import asyncio
+import threading
+from collections import deque
+from typing import AsyncGenerator, Any, Dict, List, Optional, Tuple
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+
+from agent.utils.logger import logger
+
+MODEL_HEDGE_AFTER_SECONDS = float(os.getenv("MODEL_HEDGE_AFTER_SECONDS", "20"))
+MODEL_HEDGE_MIN_SAMPLES = int(os.getenv("MODEL_HEDGE_MIN_SAMPLES", "20"))
+MODEL_MAX_HEDGES = int(os.getenv("MODEL_MAX_HEDGES", "1"))
+MODEL_LATENCY_WINDOW = int(os.getenv("MODEL_LATENCY_WINDOW", "200"))
+MODEL_BREAKER_WINDOW = int(os.getenv("MODEL_BREAKER_WINDOW", "20"))
+MODEL_BREAKER_MIN_CALLS = int(os.getenv("MODEL_BREAKER_MIN_CALLS", "5"))
+MODEL_BREAKER_ERROR_RATE = float(os.getenv("MODEL_BREAKER_ERROR_RATE", "0.5"))
+MODEL_BREAKER_COOLDOWN_SECONDS = float(os.getenv("MODEL_BREAKER_COOLDOWN_SECONDS", "30"))
+
+
+class LatencyStats:
+    """Rolling call latencies (successes and cancelled hedge losers) plus lifetime counters."""
+
+    def __init__(self, window: int = MODEL_LATENCY_WINDOW):
+        self.latencies: deque = deque(maxlen=window)
+        self.calls = 0
+        self.failures = 0
+        self.hedges_fired = 0
+        self.hedges_won = 0
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def hedge_delay(self) -> float:
+        """Seconds to wait before hedging: the p95, once there are enough samples."""
+        if len(self.latencies) < MODEL_HEDGE_MIN_SAMPLES:
+            return MODEL_HEDGE_AFTER_SECONDS
+        return self.percentile(0.95)
+
+
+class CircuitBreaker:
+    """Opens when the error rate over the last `window` calls reaches `error_rate`.
+
+    After `cooldown` seconds one trial call is let through (half-open); its
+    outcome closes the breaker again or re-opens it.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window: int = MODEL_BREAKER_WINDOW,
+        min_calls: int = MODEL_BREAKER_MIN_CALLS,
+        error_rate: float = MODEL_BREAKER_ERROR_RATE,
+        cooldown: float = MODEL_BREAKER_COOLDOWN_SECONDS,
+    ):
+        self.name = name
+        self.outcomes: deque = deque(maxlen=window)
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.cooldown = cooldown
+        self.state = "closed"
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def available(self) -> bool:
+        """Whether a call could go through now; unlike `acquire`, changes nothing."""
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open":
+                return time.monotonic() - self.opened_at >= self.cooldown
+            return not self._trial_in_flight
+
+    def acquire(self) -> bool:
+        """Admit a call, taking the single half-open trial slot if needed."""
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open":
+                if time.monotonic() - self.opened_at < self.cooldown:
+                    return False
+                self.state = "half_open"
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def release(self) -> None:
+        """Give back a half-open trial whose call was cancelled."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record(self, success: bool) -> None:
+        with self._lock:
+            if self.state == "half_open":
+                self._trial_in_flight = False
+                if success:
+                    self.state = "closed"
+                    self.outcomes.clear()
+                else:
+                    self._open()
+                return
+            self.outcomes.append(success)
+            failures = self.outcomes.count(False)
+            if (
+                self.state == "closed"
+                and len(self.outcomes) >= self.min_calls
+                and failures / len(self.outcomes) >= self.error_rate
+            ):
+                self._open()
+
+    def _open(self) -> None:
+        self.state = "open"
+        self.opened_at = time.monotonic()
+        logger.warning(
+            f"Circuit for model provider {self.name} opened for {self.cooldown:.0f}s"
+        )
+
+
+class Provider:
+    def __init__(self, name: str, llm: BaseLlm):
+        self.name = name
+        self.llm = llm
+        self.stats = LatencyStats()
+        self.breaker = CircuitBreaker(name)
+
+
+class ProviderRouter(BaseLlm):
+    """Routes each model call over an ordered list of providers.
+
+    The first provider whose circuit is closed gets the call. If it has not
+    answered within its p95 latency (MODEL_HEDGE_AFTER_SECONDS until
+    MODEL_HEDGE_MIN_SAMPLES calls are recorded), the next provider is raced
+    against it and the first success wins. A failed call falls back to the next
+    provider. Each attempt's responses are buffered, so a losing or failed
+    attempt never leaks partial output into the session.
+    """
+
+    model: str = "provider-router"
+    providers: List[Provider]
+
+    @classmethod
+    def from_providers(cls, providers: List[Tuple[str, BaseLlm]]) -> "ProviderRouter":
+        names = "+".join(name for name, _ in providers)
+        return cls(
+            model=f"router/{names}",
+            providers=[Provider(name, llm) for name, llm in providers],
+        )
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        report = {}
+        for provider in self.providers:
+            p50, p95 = provider.stats.percentile(0.5), provider.stats.percentile(0.95)
+            report[provider.name] = {
+                "model": provider.llm.model,
+                "circuit": provider.breaker.state,
+                "calls": provider.stats.calls,
+                "failures": provider.stats.failures,
+                "p50_ms": round(p50 * 1000) if p50 is not None else None,
+                "p95_ms": round(p95 * 1000) if p95 is not None else None,
+                "hedges_fired": provider.stats.hedges_fired,
+                "hedges_won": provider.stats.hedges_won,
+            }
+        return report
+
+    async def _attempt(
+        self, provider: Provider, llm_request: LlmRequest, stream: bool
+    ) -> List[LlmResponse]:
+        # Providers mutate the request (model name, appended contents, config
+        # headers), so every attempt, including a concurrent hedge, gets its own.
+        request = llm_request.model_copy(
+            update={
+                "model": provider.llm.model,
+                "contents": list(llm_request.contents),
+                "config": llm_request.config.model_copy(deep=True),
+            }
+        )
+        provider.stats.calls += 1
+        started = time.perf_counter()
+        try:
+            responses = [
+                response
+                async for response in provider.llm.generate_content_async(request, stream=stream)
+            ]
+        except asyncio.CancelledError:
+            # A hedge loser's elapsed time is a lower bound on its latency; keep
+            # it so a slow provider's p95 is not computed from its fast calls only.
+            provider.stats.latencies.append(time.perf_counter() - started)
+            provider.breaker.release()
+            raise
+        except Exception:
+            provider.stats.failures += 1
+            provider.breaker.record(False)
+            raise
+        provider.stats.latencies.append(time.perf_counter() - started)
+        provider.breaker.record(True)
+        return responses
+
+    async def _route(self, llm_request: LlmRequest, stream: bool) -> List[LlmResponse]:
+        # Breakers are only acquired when a provider is actually launched, so a
+        # half-open fallback that is never needed keeps its trial slot free.
+        candidates = [p for p in self.providers if p.breaker.available()]
+        forced = not candidates
+        if forced:
+            logger.warning("All model provider circuits are open, trying every provider")
+            candidates = list(self.providers)
+
+        loop = asyncio.get_running_loop()
+        tasks: Dict[asyncio.Task, Provider] = {}
+        started: Dict[Provider, float] = {}
+        hedges: List[Provider] = []
+        next_index = 0
+        last_error: Optional[BaseException] = None
+
+        def launch() -> Optional[Provider]:
+            nonlocal next_index
+            while next_index < len(candidates):
+                provider = candidates[next_index]
+                next_index += 1
+                if forced or provider.breaker.acquire():
+                    started[provider] = loop.time()
+                    task = asyncio.create_task(self._attempt(provider, llm_request, stream))
+                    tasks[task] = provider
+                    return provider
+            return None
+
+        primary = launch()
+        if primary is None:
+            raise RuntimeError("No model provider available, every circuit is open")
+        try:
+            while tasks:
+                # At most MODEL_MAX_HEDGES attempts race the primary at any time; a
+                # hedge that fails fast frees its slot for the next provider.
+                can_hedge = len(tasks) <= MODEL_MAX_HEDGES and next_index < len(candidates)
+                hedge_delay = primary.stats.hedge_delay()
+                timeout = (
+                    max(0.0, started[primary] + hedge_delay - loop.time()) if can_hedge else None
+                )
+                done, _ = await asyncio.wait(
+                    tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    hedge = launch()
+                    if hedge is None:
+                        continue
+                    hedges.append(hedge)
+                    primary.stats.hedges_fired += 1
+                    logger.info(
+                        f"Model provider {primary.name} slower than {hedge_delay:.1f}s, "
+                        f"hedging with {hedge.name}"
+                    )
+                    continue
+
+                for task in done:
+                    provider = tasks.pop(task)
+                    if task.exception() is None:
+                        if provider in hedges:
+                            provider.stats.hedges_won += 1
+                        logger.debug("Model call served by %s", provider.name)
+                        return task.result()
+                    last_error = task.exception()
+                    logger.warning(f"Model provider {provider.name} failed: {last_error}")
+
+                if tasks:
+                    if primary not in tasks.values():
+                        # The primary failed while a hedge runs; hedge against that instead.
+                        primary = next(iter(tasks.values()))
+                elif (fallback := launch()) is not None:
+                    primary = fallback
+                    logger.info(f"Falling back to model provider {primary.name}")
+            raise last_error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        for response in await self._route(llm_request, stream):
+            yield response
@@ -0,0 +1,138 @@
+"""Local stub model endpoint for exercising fallbacks, hedging and circuit breakers.
+
+Run one per simulated provider, e.g. a slow primary and a flaky fallback:
+
+    python -m agent.models.stub_provider --port 9001 --latency-ms 8000
+    python -m agent.models.stub_provider --port 9002 --latency-ms 300 --error-rate 0.3
+
+then point the providers at them:
+
+    MODEL_PROVIDER=openai OPENAI_API_BASE=http://127.0.0.1:9001/v1 OPENAI_API_KEY=stub
+    MODEL_FALLBACKS=claude ANTHROPIC_API_BASE=http://127.0.0.1:9002 ANTHROPIC_API_KEY=stub
+
+The stub answers the OpenAI (/chat/completions), Anthropic (/v1/messages),
+Ollama (/api/chat) and Gemini (:generateContent) request shapes, non-streaming.
+Failures are returned as HTTP 503.
+"""
+
+import json
+import time
+import random
+import argparse
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict
+
+
+def _openai(model: str, text: str) -> Dict[str, Any]:
+    return {
+        "id": "chatcmpl-stub",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": text},
+                "finish_reason": "stop",
+            }
+        ],
+        "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+    }
+
+
+def _anthropic(model: str, text: str) -> Dict[str, Any]:
+    return {
+        "id": "msg_stub",
+        "type": "message",
+        "role": "assistant",
+        "model": model,
+        "content": [{"type": "text", "text": text}],
+        "stop_reason": "end_turn",
+        "stop_sequence": None,
+        "usage": {"input_tokens": 0, "output_tokens": 0},
+    }
+
+
+def _ollama(model: str, text: str) -> Dict[str, Any]:
+    return {
+        "model": model,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "message": {"role": "assistant", "content": text},
+        "done": True,
+        "done_reason": "stop",
+        "prompt_eval_count": 0,
+        "eval_count": 0,
+    }
+
+
+def _gemini(model: str, text: str) -> Dict[str, Any]:
+    return {
+        "candidates": [
+            {"content": {"role": "model", "parts": [{"text": text}]}, "finishReason": "STOP", "index": 0}
+        ],
+        "usageMetadata": {"promptTokenCount": 0, "candidatesTokenCount": 0, "totalTokenCount": 0},
+        "modelVersion": model,
+    }
+
+
+def make_handler(latency_ms: float, jitter_ms: float, error_rate: float, text: str):
+    class StubHandler(BaseHTTPRequestHandler):
+        def _send(self, status: int, body: Dict[str, Any]) -> None:
+            payload = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_POST(self) -> None:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            model = request.get("model", "stub")
+            time.sleep(max(0.0, latency_ms + random.uniform(-jitter_ms, jitter_ms)) / 1000)
+
+            if random.random() < error_rate:
+                self._send(503, {"error": {"message": "stub failure", "type": "server_error"}})
+                return
+
+            path = self.path.split("?", 1)[0]
+            if ":generateContent" in path:
+                self._send(200, _gemini(model, text))
+            elif path.endswith("/messages"):
+                self._send(200, _anthropic(model, text))
+            elif path.endswith("/api/chat"):
+                self._send(200, _ollama(model, text))
+            elif path.endswith("/chat/completions"):
+                self._send(200, _openai(model, text))
+            else:
+                self._send(404, {"error": {"message": f"unknown path {path}"}})
+
+        def log_message(self, format: str, *args: Any) -> None:
+            print(f"[stub:{self.server.server_port}] {format % args}")
+
+    return StubHandler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=9001)
+    parser.add_argument("--latency-ms", type=float, default=200)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--response-file", help="Reply with this file's contents")
+    args = parser.parse_args()
+
+    text = "stub response"
+    if args.response_file:
+        with open(args.response_file, encoding="utf-8") as f:
+            text = f.read()
+
+    handler = make_handler(args.latency_ms, args.jitter_ms, args.error_rate, text)
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), handler)
+    print(f"Stub model endpoint on http://127.0.0.1:{args.port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+import os
+import re
+import json
+import asyncio
+from typing import List
+from google.adk.agents.invocation_context import LlmCallsLimitExceededError
+from google.adk.agents.run_config import RunConfig
+from google.adk.sessions import InMemorySessionService
+from google.adk.runners import Runner
+from google.genai import types as genai_types
+
+from agent.agent import peer_review_agent
+from agent.schemas import PeerReviewReport
+from agent.memory import get_memory_manager
+from agent.source_manager import get_source_manager
+from agent.budget import ReviewBudget, current_budget
+from agent.utils.logger import logger
+
+APP_NAME = "peer_review_agent"
+# Backstops in case the model ignores the budget-exhausted instruction.
+MAX_LLM_CALLS = int(os.getenv("REVIEW_MAX_LLM_CALLS", "40"))
+TIME_GRACE_SECONDS = float(os.getenv("REVIEW_TIME_GRACE_SECONDS", "60"))
+
+SPECULATIVE_RETRIEVAL = os.getenv("SPECULATIVE_RETRIEVAL", "true").lower() == "true"
+SPECULATIVE_TOP_K = int(os.getenv("SPECULATIVE_TOP_K", "2"))
+SPECULATIVE_MAX_SENTENCES = int(os.getenv("SPECULATIVE_MAX_SENTENCES", "32"))
+SPECULATIVE_MAX_CHUNKS = int(os.getenv("SPECULATIVE_MAX_CHUNKS", "8"))
+MIN_CLAIM_WORDS = 6
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+|\n{2,}")
+NO_SOURCE_CONTEXT = "No source excerpts were pre-fetched."
+
+
+def extract_claims(content: str) -> List[str]:
+    """Pick the sentences most likely to carry checkable claims.
+
+    Sentences with numbers are preferred; order is otherwise preserved.
+    """
+    sentences = [
+        " ".join(sentence.split())
+        for sentence in _SENTENCE_SPLIT.split(content)
+        if len(sentence.split()) >= MIN_CLAIM_WORDS
+    ]
+    ranked = sorted(
+        enumerate(sentences),
+        key=lambda item: (not any(ch.isdigit() for ch in item[1]), item[0]),
+    )
+    selected = sorted(ranked[:SPECULATIVE_MAX_SENTENCES])
+    return [sentence for _, sentence in selected]
+
+
+def prefetch_source_context(content: str, blog_id: str) -> str:
+    """Speculatively retrieve source excerpts for the post's key claims."""
+    stripped = content.strip()
+    if stripped.startswith(("http://", "https://")) and " " not in stripped:
+        return NO_SOURCE_CONTEXT
+
+    claims = extract_claims(content)
+    if not claims:
+        return NO_SOURCE_CONTEXT
+
+    results = get_source_manager().search_sources_batch(
+        claims, k=SPECULATIVE_TOP_K, blog_id=blog_id
+    )
+    best = {}
+    for matches in results:
+        for chunk, distance in matches:
+            if chunk not in best or distance < best[chunk]:
+                best[chunk] = distance
+
+    chunks = sorted(best, key=best.get)[:SPECULATIVE_MAX_CHUNKS]
+    logger.debug(
+        "Prefetched %d source chunks for %d claims", len(chunks), len(claims)
+    )
+    if not chunks:
+        return NO_SOURCE_CONTEXT
+    return "\n---\n".join(chunks)
+
+
+async def run_peer_review_async(blog_id: str, content: str) -> PeerReviewReport:
+    logger.info(f"Starting async peer review for blog_id: {blog_id}")
+
+    memory_manager = await asyncio.to_thread(get_memory_manager, blog_id)
+
+    if SPECULATIVE_RETRIEVAL:
+        past_feedback, source_context = await asyncio.gather(
+            asyncio.to_thread(memory_manager.get_blog_history, blog_id),
+            asyncio.to_thread(prefetch_source_context, content, blog_id),
+        )
+    else:
+        past_feedback = await asyncio.to_thread(memory_manager.get_blog_history, blog_id)
+        source_context = NO_SOURCE_CONTEXT
+    past_feedback_text = (
+        json.dumps(past_feedback) if past_feedback else "No previous feedback available."
+    )
+    logger.debug("Retrieved %d past feedback items", len(past_feedback))
+
+    session_id = f"session_{blog_id}"
+    session_service = InMemorySessionService()
+
+    await session_service.create_session(
+        app_name=APP_NAME,
+        user_id=blog_id,
+        session_id=session_id,
+        state={"blog_id": blog_id},
+    )
+
+    runner = Runner(
+        agent=peer_review_agent,
+        app_name=APP_NAME,
+        session_service=session_service,
+    )
+
+    review_prompt = f"""Please review the following blog content:
+
+    **Blog Content:**
+    {content}
+
+    **Past Feedback Context:**
+    {past_feedback_text}
+
+    **Source Context:**
+    {source_context}
+
+    These excerpts were retrieved for the post's key claims. Use the retrieve_source_context tool only for claims they do not cover.
+
+    Provide a comprehensive peer review report following the output schema requirements."""
+
+    logger.info("Executing runner.run_async")
+
+    full_response = ""
+    report = None
+    budget = ReviewBudget.from_env()
+    budget_token = current_budget.set(budget)
+    hard_timeout = budget.max_seconds + TIME_GRACE_SECONDS if budget.max_seconds else None
+
+    try:
+        async with asyncio.timeout(hard_timeout):
+            async for event in runner.run_async(
+                user_id=blog_id,
+                session_id=session_id,
+                new_message=genai_types.Content(
+                    role="user", parts=[genai_types.Part.from_text(text=review_prompt)]
+                ),
+                run_config=RunConfig(max_llm_calls=MAX_LLM_CALLS),
+            ):
+                if event.is_final_response():
+                    if event.content and event.content.parts:
+                        full_response = event.content.parts[0].text
+                        logger.debug(
+                            "Received final response: %d characters", len(full_response)
+                        )
+
+                    if hasattr(event, "structured_response") and event.structured_response:
+                        report = event.structured_response
+                        logger.info(
+                            "Successfully received structured PeerReviewReport from agent"
+                        )
+                    break
+    except TimeoutError:
+        logger.error(f"Review for {blog_id} exceeded hard time limit of {hard_timeout:g}s")
+        raise ValueError(f"Agent did not produce a report within {hard_timeout:g}s")
+    except LlmCallsLimitExceededError:
+        logger.error(f"Review for {blog_id} exceeded {MAX_LLM_CALLS} model calls")
+        raise ValueError(f"Agent did not produce a report within {MAX_LLM_CALLS} model calls")
+    finally:
+        current_budget.reset(budget_token)
+
+    logger.info(
+        f"Review budget usage: tool_calls={budget.tool_calls}, "
+        f"tokens={budget.tokens_used}, elapsed={budget.elapsed:.1f}s"
+    )
+
+    if not report and not full_response:
+        logger.error("No response received from agent")
+        raise ValueError("Agent did not produce a response")
+
+    if not report:
+        try:
+            response_text = full_response.strip()
+            report_data = json.loads(response_text)
+            report = PeerReviewReport(**report_data)
+            logger.info("Successfully parsed PeerReviewReport from JSON")
+
+        except json.JSONDecodeError as e:
+            logger.error(f"Failed to parse JSON response: {e}")
+            logger.debug("Raw response: %s", full_response)
+            raise ValueError(f"Agent response was not valid JSON: {e}")
+        except Exception as e:
+            logger.error(f"Error processing review report: {e}")
+            raise
+
+        await asyncio.to_thread(memory_manager.store_review, blog_id, content, report)
+        logger.info(f"Stored review in memory for blog_id: {blog_id}")
+
+    report.budgets_exhausted = list(budget.exhausted)
+    return report
+
+
+class PeerReviewer:
+    @staticmethod
+    def review_blog(blog_id: str, content: str) -> PeerReviewReport:
+        """
+        Synchronous convenience method that internally uses asyncio.run.
+        For async applications, prefer using run_peer_review_async directly.
+        """
+        logger.info(f"Using synchronous wrapper for blog_id: {blog_id}")
+        return asyncio.run(run_peer_review_async(blog_id, content))
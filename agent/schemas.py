@@ -49,3 +49,7 @@ class PeerReviewReport(BaseModel):
         default_factory=list,
         description="Granular feedback mapped to specific sentences or paragraphs in the text.",
     )
+    budgets_exhausted: List[str] = Field(
+        default_factory=list,
+        description="Set by the review runner to the review budgets that were hit. Leave empty.",
+    )
@@ -0,0 +1,61 @@
+import os
+import threading
+from typing import Callable, Dict, Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+SHARED_NAMESPACE = "shared"
+
+
+def parse_shard_map(raw: str) -> Dict[str, str]:
+    """Parse `blog_a=path/a,blog_b=path/b` into a blog_id -> persist path map."""
+    shards = {}
+    for item in raw.split(","):
+        if "=" not in item:
+            continue
+        blog_id, path = item.split("=", 1)
+        shards[blog_id.strip()] = path.strip()
+    return shards
+
+
+class ShardRouter(Generic[T]):
+    """Route blog_ids to stores, giving large tenants their own persist directory.
+
+    Every blog_id not listed in `shard_map` lives in the default shard. Stores
+    are created lazily through `factory(path)` and shared per path.
+    """
+
+    def __init__(
+        self,
+        default_path: str,
+        factory: Callable[[str], T],
+        shard_map: Optional[Dict[str, str]] = None,
+    ):
+        self.default_path = default_path
+        self.factory = factory
+        self.shard_map = shard_map or {}
+        self._stores: Dict[str, T] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, env_var: str, default_path: str, factory: Callable[[str], T]):
+        return cls(default_path, factory, parse_shard_map(os.getenv(env_var, "")))
+
+    def path_for(self, blog_id: Optional[str]) -> str:
+        return self.shard_map.get(blog_id, self.default_path) if blog_id else self.default_path
+
+    def is_dedicated(self, blog_id: Optional[str]) -> bool:
+        return self.path_for(blog_id) != self.default_path
+
+    def get_path(self, path: str) -> T:
+        if path not in self._stores:
+            with self._lock:
+                if path not in self._stores:
+                    self._stores[path] = self.factory(path)
+        return self._stores[path]
+
+    def get(self, blog_id: Optional[str] = None) -> T:
+        return self.get_path(self.path_for(blog_id))
+
+    def default(self) -> T:
+        return self.get_path(self.default_path)
@@ -1,17 +1,51 @@
 import os
 import uuid
-from typing import List, Set
-from langchain_community.vectorstores import Chroma
+import threading
+from typing import Any, Dict, List, Optional, Tuple, Union
 from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_core.documents import Document
-from langchain_text_splitters import RecursiveCharacterTextSplitter
 
+from agent.chunking import StructureAwareTextSplitter, token_length_function
+from agent.sharding import SHARED_NAMESPACE, ShardRouter
+from agent.store_service import STORE_SERVICE_SOCKET, RemoteSourceManager, get_remote_manager
 from agent.utils.logger import logger
+from agent.vector_stores import VectorRecord, VectorStoreBackend, get_backend
 
 os.environ["PYTORCH_ENABLE_MPS_FALLBACK"] = "1"
 os.environ["TOKENIZERS_PARALLELISM"] = "false"
 os.environ["TRANSFORMERS_OFFLINE"] = "0"
 
+CHUNK_SIZE_TOKENS = int(os.getenv("CHUNK_SIZE_TOKENS", "200"))
+CHUNK_OVERLAP_TOKENS = int(os.getenv("CHUNK_OVERLAP_TOKENS", "20"))
+MARKDOWN_EXTENSIONS = (".md", ".markdown")
+COLLECTION_NAME = "source_materials"
+PROJECT_NAMESPACE_PREFIX = "project:"
+
+
+def namespace_for(blog_id: Optional[str]) -> str:
+    """Namespace a source is ingested into.
+
+    Project namespaces are prefixed, so no blog_id (not even "shared") can
+    write into the shared namespace.
+    """
+    return f"{PROJECT_NAMESPACE_PREFIX}{blog_id}" if blog_id else SHARED_NAMESPACE
+
+
+def namespace_scope(blog_id: Optional[str]) -> Dict[str, Any]:
+    """`where` filter for the sources a project may see: its own plus shared ones."""
+    if not blog_id:
+        return {"namespace": SHARED_NAMESPACE}
+    return {"namespace": {"$in": [namespace_for(blog_id), SHARED_NAMESPACE]}}
+
+
+def _open_backend(path: str) -> VectorStoreBackend:
+    backend = get_backend(path, COLLECTION_NAME)
+    # Chunks ingested before namespaces existed stay visible to every project.
+    backfilled = backend.backfill_metadata("namespace", SHARED_NAMESPACE)
+    if backfilled:
+        logger.info(f"Marked {backfilled} un-namespaced chunks in {path} as shared")
+    return backend
+
 
 class SourceManager:
     def __init__(self, persistence_path: str = "agent/source_store"):
@@ -29,89 +63,214 @@ class SourceManager:
                 encode_kwargs={"normalize_embeddings": True},
                 show_progress=False,
             )
-            self.vector_store = Chroma(
-                collection_name="source_materials",
-                embedding_function=self.embeddings,
-                persist_directory=persistence_path,
+            self.router = ShardRouter.from_env(
+                "SOURCE_SHARDS", persistence_path, _open_backend
             )
-            self.text_splitter = RecursiveCharacterTextSplitter(
-                chunk_size=800,
-                chunk_overlap=200,
-                length_function=len,
+            self.router.default()
+            token_length, max_tokens = token_length_function(self.embeddings)
+            chunk_size = min(CHUNK_SIZE_TOKENS, max_tokens)
+            self.text_splitter = StructureAwareTextSplitter(
+                markdown=True,
+                chunk_size=chunk_size,
+                chunk_overlap=CHUNK_OVERLAP_TOKENS,
+                length_function=token_length,
+            )
+            self.plain_text_splitter = StructureAwareTextSplitter(
+                markdown=False,
+                chunk_size=chunk_size,
+                chunk_overlap=CHUNK_OVERLAP_TOKENS,
+                length_function=token_length,
             )
         except Exception as e:
             logger.critical(f"Failed to initialize SourceManager: {e}")
             raise
 
-    def add_source(self, content: str, source_name: str) -> None:
-        if not content.strip():
-            logger.warning(f"Attempted to add empty source: {source_name}")
-            return
+    def _backends(self, blog_id: Optional[str]) -> List[VectorStoreBackend]:
+        """Backends holding the sources visible to blog_id, dedicated shard first."""
+        backends = [self.router.get(blog_id)]
+        if self.router.is_dedicated(blog_id):
+            backends.append(self.router.default())
+        return backends
 
-        try:
-            logger.info(f"Adding source: {source_name}")
-            raw_doc = Document(page_content=content, metadata={"source": source_name})
+    def add_source(
+        self, content: str, source_name: str, blog_id: Optional[str] = None
+    ) -> bool:
+        """Ingest a source for blog_id, or as a shared source when blog_id is None.
 
-            docs = self.text_splitter.split_documents([raw_doc])
+        Returns whether it was stored; failures are logged.
+        """
+        return self.add_sources([(content, source_name, blog_id)])[0]
 
+    def _split_source(
+        self, content: str, source_name: str, namespace: str
+    ) -> List[Document]:
+        raw_doc = Document(page_content=content, metadata={"source": source_name})
+        splitter = (
+            self.text_splitter
+            if source_name.lower().endswith(MARKDOWN_EXTENSIONS)
+            else self.plain_text_splitter
+        )
+        docs = splitter.split_documents([raw_doc])
+        for i, doc in enumerate(docs):
+            doc.metadata["chunk_index"] = i
+            doc.metadata["source"] = source_name
+            doc.metadata["namespace"] = namespace
+            doc.id = f"{source_name}_{i}_{str(uuid.uuid4())[:8]}"
+        return docs
+
+    def add_sources(self, sources: List[Tuple[str, str, Optional[str]]]) -> List[bool]:
+        """Ingest (content, source_name, blog_id) tuples with one embedding pass
+        and one write per shard. Returns, per tuple, whether it was stored."""
+        stored = [False] * len(sources)
+        docs_by_path: Dict[str, List[Tuple[int, Document]]] = {}
+        for index, (content, source_name, blog_id) in enumerate(sources):
+            if not content.strip():
+                logger.warning(f"Attempted to add empty source: {source_name}")
+                continue
+            namespace = namespace_for(blog_id)
+            try:
+                logger.info(f"Adding source: {source_name} (namespace: {namespace})")
+                docs = self._split_source(content, source_name, namespace)
+            except Exception as e:
+                logger.error(f"Error adding source {source_name}: {e}")
+                continue
             if not docs:
                 logger.warning(f"No chunks created for source: {source_name}")
-                return
-
-            for i, doc in enumerate(docs):
-                doc.metadata["chunk_index"] = i
-                doc.metadata["source"] = source_name
-                doc.id = f"{source_name}_{i}_{str(uuid.uuid4())[:8]}"
+                continue
+            # Shared sources always live in the default shard.
+            docs_by_path.setdefault(self.router.path_for(blog_id), []).extend(
+                (index, doc) for doc in docs
+            )
 
-            self.vector_store.add_documents(docs)
-            logger.info(
-                f"Successfully added source '{source_name}' with {len(docs)} chunks."
+        all_docs = [doc for docs in docs_by_path.values() for _, doc in docs]
+        if not all_docs:
+            return stored
+        names = sorted({doc.metadata["source"] for doc in all_docs})
+        try:
+            embeddings = self.embeddings.embed_documents(
+                [doc.page_content for doc in all_docs]
             )
         except Exception as e:
-            logger.error(f"Error adding source {source_name}: {e}")
+            logger.error(f"Error embedding sources {names}: {e}")
+            return stored
 
-    def search_sources(self, query: str, k: int = 3) -> List[str]:
+        offset = 0
+        for path, docs in docs_by_path.items():
+            try:
+                self.router.get_path(path).add(
+                    ids=[doc.id for _, doc in docs],
+                    texts=[doc.page_content for _, doc in docs],
+                    embeddings=embeddings[offset:offset + len(docs)],
+                    metadatas=[doc.metadata for _, doc in docs],
+                )
+            except Exception as e:
+                logger.error(f"Error adding sources to {path}: {e}")
+            else:
+                for index, _ in docs:
+                    stored[index] = True
+            offset += len(docs)
+        logger.info(
+            f"Added {sum(stored)} of {len(sources)} source(s) {names} "
+            f"with {len(all_docs)} chunks."
+        )
+        return stored
+
+    def _search_batch(
+        self, embeddings: List[List[float]], k: int, blog_id: Optional[str]
+    ) -> List[List[VectorRecord]]:
+        where = namespace_scope(blog_id)
+        merged: List[List[VectorRecord]] = [[] for _ in embeddings]
+        for backend in self._backends(blog_id):
+            for records, found in zip(merged, backend.search_batch(embeddings, k, where)):
+                records.extend(found)
+        return [sorted(records, key=lambda r: r.distance)[:k] for records in merged]
+
+    def search_sources(
+        self, query: str, k: int = 3, blog_id: Optional[str] = None
+    ) -> List[str]:
         try:
-            logger.debug(f"Searching sources with query: '{query}' (k={k})")
-            results = self.vector_store.similarity_search(query, k=k)
-            logger.debug(f"Found {len(results)} results")
-            return [doc.page_content for doc in results]
+            logger.debug("Searching sources with query: '%s' (k=%d)", query, k)
+            results = self._search_batch([self.embeddings.embed_query(query)], k, blog_id)[0]
+            logger.debug("Found %d results", len(results))
+            return [record.text for record in results]
         except Exception as e:
             logger.error(f"Error searching sources: {e}")
             return []
 
-    def list_sources(self) -> List[str]:
+    def search_sources_batch(
+        self, queries: List[str], k: int = 3, blog_id: Optional[str] = None
+    ) -> List[List[Tuple[str, float]]]:
+        """Search many queries with one embedding pass and one query per shard.
+
+        Returns, per query, up to k (chunk, distance) pairs.
+        """
+        if not queries:
+            return []
+        try:
+            logger.debug("Batch searching sources with %d queries (k=%d)", len(queries), k)
+            results = self._search_batch(self.embeddings.embed_documents(queries), k, blog_id)
+            return [
+                [(record.text, record.distance) for record in records]
+                for records in results
+            ]
+        except Exception as e:
+            logger.error(f"Error batch searching sources: {e}")
+            return [[] for _ in queries]
+
+    def list_sources(self, blog_id: Optional[str] = None) -> List[str]:
         try:
             logger.debug("Listing available sources")
-            result = self.vector_store._collection.get(include=["metadatas"])
-            sources: Set[str] = set()
-            if result["metadatas"]:
-                for meta in result["metadatas"]:
-                    if "source" in meta:
-                        sources.add(meta["source"])
+            where = namespace_scope(blog_id)
+            sources = sorted(
+                {
+                    source
+                    for backend in self._backends(blog_id)
+                    for source in backend.list_sources(where)
+                }
+            )
             logger.info(f"Found {len(sources)} unique sources")
-            return list(sources)
+            return sources
         except Exception as e:
             logger.error(f"Error listing sources: {e}")
             return []
 
-    def get_source_content(self, source_name: str) -> str:
+    def get_source_content(self, source_name: str, blog_id: Optional[str] = None) -> str:
         try:
             logger.debug(f"Retrieving content for source: {source_name}")
-            result = self.vector_store._collection.get(
-                where={"source": source_name}, include=["documents", "metadatas"]
+            where = namespace_scope(blog_id)
+            records = next(
+                (
+                    found
+                    for backend in self._backends(blog_id)
+                    if (found := backend.get_by_source(source_name, where))
+                ),
+                [],
             )
 
-            if not result["documents"]:
+            if not records:
                 logger.warning(f"No documents found for source: {source_name}")
                 return ""
 
-            chunks_with_meta = zip(result["documents"], result["metadatas"])
-            sorted_chunks = sorted(
-                chunks_with_meta, key=lambda x: x[1].get("chunk_index", 0)
-            )
-
-            return "\n\n".join([chunk for chunk, _ in sorted_chunks])
+            return "\n\n".join([record.text for record in records])
         except Exception as e:
             logger.error(f"Error getting source content for {source_name}: {e}")
             return ""
+
+
+_source_manager: Optional[SourceManager] = None
+_source_manager_lock = threading.Lock()
+
+
+def get_source_manager() -> Union[SourceManager, RemoteSourceManager]:
+    """Return the process-wide SourceManager, loading the embedding model once.
+
+    With STORE_SERVICE_SOCKET set, the store service owns the store instead.
+    """
+    global _source_manager
+    if STORE_SERVICE_SOCKET:
+        return get_remote_manager("source")
+    if _source_manager is None:
+        with _source_manager_lock:
+            if _source_manager is None:
+                _source_manager = SourceManager()
+    return _source_manager
@@ -0,0 +1,17 @@
+from agent.store_service.client import (
+    STORE_SERVICE_SOCKET,
+    RemoteMemoryManager,
+    RemoteSourceManager,
+    StoreClient,
+    StoreServiceError,
+    get_remote_manager,
+)
+
+__all__ = [
+    "STORE_SERVICE_SOCKET",
+    "RemoteMemoryManager",
+    "RemoteSourceManager",
+    "StoreClient",
+    "StoreServiceError",
+    "get_remote_manager",
+]
@@ -0,0 +1,222 @@
+import json
+import os
+import socket
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from agent.utils.logger import logger
+
+STORE_SERVICE_SOCKET = os.getenv("STORE_SERVICE_SOCKET", "")
+STORE_SERVICE_TIMEOUT_SECONDS = float(os.getenv("STORE_SERVICE_TIMEOUT_SECONDS", "300"))
+STORE_SERVICE_CONNECT_TIMEOUT_SECONDS = float(
+    os.getenv("STORE_SERVICE_CONNECT_TIMEOUT_SECONDS", "120")
+)
+
+
+class StoreServiceError(RuntimeError):
+    """The store service ran the request and reported an error."""
+
+
+def encode_message(message: Dict[str, Any]) -> bytes:
+    """One JSON object per line; the protocol both ends speak."""
+    return json.dumps(message, default=str).encode("utf-8") + b"\n"
+
+
+def _peer_closed(sock: socket.socket) -> bool:
+    timeout = sock.gettimeout()
+    sock.setblocking(False)
+    try:
+        return sock.recv(1, socket.MSG_PEEK) == b""
+    except BlockingIOError:
+        return False
+    except OSError:
+        return True
+    finally:
+        sock.settimeout(timeout)
+
+
+class StoreClient:
+    """Blocking client for the store service.
+
+    Each thread keeps its own connection, so worker threads never wait on each
+    other client-side; the service handles connections concurrently.
+    """
+
+    def __init__(
+        self,
+        socket_path: str = STORE_SERVICE_SOCKET,
+        timeout: float = STORE_SERVICE_TIMEOUT_SECONDS,
+    ):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connect(self) -> Tuple[socket.socket, Any]:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.socket_path)
+        except OSError:
+            sock.close()
+            raise
+        return sock, sock.makefile("rb")
+
+    def _close(self) -> None:
+        connection = getattr(self._local, "connection", None)
+        self._local.connection = None
+        if connection:
+            connection[1].close()
+            connection[0].close()
+
+    def _pooled_connection(self) -> Tuple[socket.socket, Any]:
+        connection = getattr(self._local, "connection", None)
+        if connection is not None and _peer_closed(connection[0]):
+            # The service restarted since this connection was last used.
+            self._close()
+            connection = None
+        if connection is None:
+            connection = self._local.connection = self._connect()
+        return connection
+
+    def call(self, op: str, **args: Any) -> Any:
+        payload = encode_message({"op": op, "args": args})
+        for attempt in range(2):
+            sent = False
+            try:
+                sock, reader = self._pooled_connection()
+                sock.sendall(payload)
+                sent = True
+                line = reader.readline()
+                if not line:
+                    raise ConnectionError("Store service closed the connection")
+                break
+            except OSError:
+                self._close()
+                # Only a request that never fully went out is safe to send again;
+                # once sent, a write may already be applied even if the reply
+                # timed out or the connection dropped.
+                if sent or attempt:
+                    raise
+
+        response = json.loads(line)
+        if "error" in response:
+            raise StoreServiceError(response["error"])
+        return response["result"]
+
+    def wait_ready(self, timeout: float = STORE_SERVICE_CONNECT_TIMEOUT_SECONDS) -> None:
+        """Block until the service answers a ping, e.g. while it loads models."""
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                self.call("ping")
+                return
+            except OSError as e:
+                if time.monotonic() >= deadline:
+                    raise ConnectionError(
+                        f"Store service at {self.socket_path} not reachable: {e}"
+                    ) from e
+                time.sleep(0.5)
+
+
+class RemoteSourceManager:
+    """SourceManager API served by the store service instead of a local store."""
+
+    def __init__(self, client: StoreClient):
+        self.client = client
+
+    def add_source(
+        self, content: str, source_name: str, blog_id: Optional[str] = None
+    ) -> bool:
+        try:
+            return bool(
+                self.client.call(
+                    "add_source", content=content, source_name=source_name, blog_id=blog_id
+                )
+            )
+        except (OSError, StoreServiceError) as e:
+            logger.error(f"Error adding source {source_name}: {e}")
+            return False
+
+    def search_sources(
+        self, query: str, k: int = 3, blog_id: Optional[str] = None
+    ) -> List[str]:
+        try:
+            return self.client.call("search_sources", query=query, k=k, blog_id=blog_id)
+        except (OSError, StoreServiceError) as e:
+            logger.error(f"Error searching sources: {e}")
+            return []
+
+    def search_sources_batch(
+        self, queries: List[str], k: int = 3, blog_id: Optional[str] = None
+    ) -> List[List[Tuple[str, float]]]:
+        if not queries:
+            return []
+        try:
+            results = self.client.call(
+                "search_sources_batch", queries=queries, k=k, blog_id=blog_id
+            )
+            return [[tuple(hit) for hit in hits] for hits in results]
+        except (OSError, StoreServiceError) as e:
+            logger.error(f"Error batch searching sources: {e}")
+            return [[] for _ in queries]
+
+    def list_sources(self, blog_id: Optional[str] = None) -> List[str]:
+        try:
+            return self.client.call("list_sources", blog_id=blog_id)
+        except (OSError, StoreServiceError) as e:
+            logger.error(f"Error listing sources: {e}")
+            return []
+
+    def get_source_content(self, source_name: str, blog_id: Optional[str] = None) -> str:
+        try:
+            return self.client.call(
+                "get_source_content", source_name=source_name, blog_id=blog_id
+            )
+        except (OSError, StoreServiceError) as e:
+            logger.error(f"Error getting source content for {source_name}: {e}")
+            return ""
+
+
+class RemoteMemoryManager:
+    """MemoryManager API served by the store service, which routes blog_ids to shards."""
+
+    def __init__(self, client: StoreClient):
+        self.client = client
+
+    def get_blog_history(self, blog_id: str) -> List[Dict[str, Any]]:
+        try:
+            return self.client.call("get_blog_history", blog_id=blog_id)
+        except (OSError, StoreServiceError) as e:
+            logger.error(f"Error retrieving history for blog_id {blog_id}: {e}")
+            return []
+
+    def store_review(self, blog_id: str, content: str, feedback: Any) -> None:
+        if hasattr(feedback, "model_dump_json"):
+            feedback = feedback.model_dump_json()
+        try:
+            self.client.call(
+                "store_review", blog_id=blog_id, content=content, feedback=feedback
+            )
+        except (OSError, StoreServiceError) as e:
+            logger.error(f"Error storing review for blog_id {blog_id}: {e}")
+
+
+_remote_managers: Dict[str, Any] = {}
+_remote_managers_lock = threading.Lock()
+
+
+def get_remote_manager(kind: str):
+    """Return the process-wide remote "source" or "memory" manager.
+
+    The first call waits for the service to come up.
+    """
+    if kind not in _remote_managers:
+        with _remote_managers_lock:
+            if kind not in _remote_managers:
+                client = StoreClient()
+                client.wait_ready()
+                logger.info(f"Using store service at {client.socket_path} for {kind}")
+                manager_class = RemoteSourceManager if kind == "source" else RemoteMemoryManager
+                _remote_managers[kind] = manager_class(client)
+    return _remote_managers[kind]
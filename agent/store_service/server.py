@@ -0,0 +1,223 @@
+"""Single-writer store service for the source and memory stores.
+
+Run one per host with:
+
+    python -m agent.store_service.server [--socket PATH]
+
+and set STORE_SERVICE_SOCKET to the same path for every Streamlit or API
+worker. The service is then the only process that opens agent/source_store
+and agent/memory_store (and their shards). Reads run concurrently on a thread
+pool. Writes are queued per store and applied by a single writer thread, in
+batches of up to STORE_SERVICE_WRITE_BATCH_SIZE collected over
+STORE_SERVICE_WRITE_BATCH_WINDOW_MS. A write is acknowledged only once it is
+applied, so workers read their own writes and never see a stale index.
+
+The protocol is one JSON object per line: `{"op": ..., "args": {...}}`,
+answered by `{"result": ...}` or `{"error": "..."}`.
+"""
+
+import os
+import json
+import stat
+import signal
+import socket
+import asyncio
+import argparse
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from agent.memory import memory_router
+from agent.source_manager import SourceManager
+from agent.store_service.client import STORE_SERVICE_SOCKET, encode_message
+from agent.utils.logger import logger
+
+DEFAULT_SOCKET_PATH = "agent/store_service.sock"
+READ_THREADS = int(os.getenv("STORE_SERVICE_READ_THREADS", "8"))
+WRITE_BATCH_SIZE = int(os.getenv("STORE_SERVICE_WRITE_BATCH_SIZE", "32"))
+WRITE_BATCH_WINDOW_MS = float(os.getenv("STORE_SERVICE_WRITE_BATCH_WINDOW_MS", "50"))
+MAX_MESSAGE_BYTES = 64 * 1024 * 1024
+
+
+class WriteLane:
+    """Serializes the writes to one store through a single thread, in batches."""
+
+    def __init__(
+        self, name: str, apply_batch: Callable[[List[Dict[str, Any]]], Optional[List[Any]]]
+    ):
+        self.name = name
+        self.apply_batch = apply_batch
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix=f"store-writer-{name}"
+        )
+
+    async def submit(self, args: Dict[str, Any]) -> Any:
+        """Queue a write and return its result once the batch is applied."""
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((args, future))
+        return await future
+
+    async def _next_batch(self) -> List[Tuple[Dict[str, Any], asyncio.Future]]:
+        loop = asyncio.get_running_loop()
+        batch = [await self.queue.get()]
+        deadline = loop.time() + WRITE_BATCH_WINDOW_MS / 1000
+        while len(batch) < WRITE_BATCH_SIZE:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except TimeoutError:
+                break
+        return batch
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._next_batch()
+            logger.debug("Applying %d %s write(s)", len(batch), self.name)
+            results, error = None, None
+            try:
+                results = await loop.run_in_executor(
+                    self.executor, self.apply_batch, [args for args, _ in batch]
+                )
+            except Exception as e:
+                logger.error(f"Store service {self.name} write batch failed: {e}")
+                error = e
+            for i, (_, future) in enumerate(batch):
+                if not future.done():
+                    if error:
+                        future.set_exception(error)
+                    else:
+                        future.set_result(results[i] if results else None)
+                self.queue.task_done()
+
+
+class StoreServer:
+    def __init__(self, source_manager: SourceManager):
+        self.source_manager = source_manager
+        self.read_executor = ThreadPoolExecutor(
+            max_workers=READ_THREADS, thread_name_prefix="store-reader"
+        )
+        self.reads: Dict[str, Callable[..., Any]] = {
+            "ping": lambda: "pong",
+            "search_sources": source_manager.search_sources,
+            "search_sources_batch": source_manager.search_sources_batch,
+            "list_sources": source_manager.list_sources,
+            "get_source_content": source_manager.get_source_content,
+            "get_blog_history": lambda blog_id: memory_router.get(blog_id).get_blog_history(
+                blog_id
+            ),
+        }
+        self.writes: Dict[str, WriteLane] = {
+            "add_source": WriteLane("sources", self._apply_source_writes),
+            "store_review": WriteLane("memory", self._apply_memory_writes),
+        }
+
+    def _apply_source_writes(self, batch: List[Dict[str, Any]]) -> List[bool]:
+        return self.source_manager.add_sources(
+            [(args["content"], args["source_name"], args.get("blog_id")) for args in batch]
+        )
+
+    def _apply_memory_writes(self, batch: List[Dict[str, Any]]) -> None:
+        for args in batch:
+            memory_router.get(args["blog_id"]).store_review(
+                args["blog_id"], args["content"], args["feedback"]
+            )
+
+    async def dispatch(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        op, args = request.get("op"), request.get("args") or {}
+        if not isinstance(args, dict):
+            return {"error": f"Malformed request: args for {op} must be an object"}
+        try:
+            if op in self.writes:
+                return {"result": await self.writes[op].submit(args)}
+            if op in self.reads:
+                result = await asyncio.get_running_loop().run_in_executor(
+                    self.read_executor, partial(self.reads[op], **args)
+                )
+                return {"result": result}
+            return {"error": f"Unknown store service op: {op}"}
+        except Exception as e:
+            logger.error(f"Store service {op} failed: {e}")
+            return {"error": str(e)}
+
+    async def handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            while line := await reader.readline():
+                if not line.endswith(b"\n"):
+                    # The client went away mid-request; never act on a truncated line.
+                    break
+                try:
+                    request = json.loads(line)
+                except json.JSONDecodeError as e:
+                    response = {"error": f"Malformed request: {e}"}
+                else:
+                    if isinstance(request, dict):
+                        response = await self.dispatch(request)
+                    else:
+                        response = {"error": "Malformed request: expected a JSON object"}
+                writer.write(encode_message(response))
+                await writer.drain()
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError) as e:
+            logger.warning(f"Dropping store service connection: {e}")
+        finally:
+            writer.close()
+
+    async def serve(self, socket_path: str) -> None:
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+
+        _remove_stale_socket(socket_path)
+        lanes = [asyncio.create_task(lane.run()) for lane in self.writes.values()]
+        server = await asyncio.start_unix_server(
+            self.handle_connection, path=socket_path, limit=MAX_MESSAGE_BYTES
+        )
+        os.chmod(socket_path, stat.S_IRUSR | stat.S_IWUSR)
+        logger.info(f"Store service listening on {socket_path}")
+        try:
+            await stop.wait()
+            logger.info("Store service shutting down, draining queued writes")
+            server.close()
+            for lane in self.writes.values():
+                await lane.queue.join()
+        finally:
+            for task in lanes:
+                task.cancel()
+            if os.path.exists(socket_path):
+                os.unlink(socket_path)
+
+
+def _remove_stale_socket(socket_path: str) -> None:
+    """Remove a socket file left by a crashed service; refuse if one is still live."""
+    if not os.path.exists(socket_path):
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(socket_path)
+    except OSError:
+        os.unlink(socket_path)
+        return
+    finally:
+        probe.close()
+    raise RuntimeError(f"A store service is already listening on {socket_path}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--socket", default=STORE_SERVICE_SOCKET or DEFAULT_SOCKET_PATH)
+    args = parser.parse_args()
+
+    # Load models and open the stores before accepting connections.
+    source_manager = SourceManager()
+    memory_router.default()
+    asyncio.run(StoreServer(source_manager).serve(args.socket))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,8 @@
 from google.adk.agents import Agent
 from google.adk.tools import google_search
 
+from agent.budget import budget_after_model_callback
+
 
 google_search_agent = Agent(
     model="gemini-2.5-flash",
@@ -10,4 +12,6 @@ google_search_agent = Agent(
     You are a search agent responsible for searching google for information requested by the user. Use the google_search
     """,
     tools=[google_search],
+    # Runs nested inside the review, so its tokens count against the review's budget.
+    after_model_callback=budget_after_model_callback,
 )
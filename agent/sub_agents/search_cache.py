@@ -0,0 +1,162 @@
+import os
+import re
+import time
+import asyncio
+import hashlib
+import sqlite3
+import threading
+import unicodedata
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from google.adk.tools.agent_tool import AgentTool
+
+from agent.utils.logger import logger
+
+SEARCH_CACHE_PATH = os.getenv("SEARCH_CACHE_PATH", "agent/search_cache/search_cache.db")
+SEARCH_CACHE_TTL_SECONDS = int(os.getenv("SEARCH_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+SEARCH_CACHE_VOLATILE_TTL_SECONDS = int(
+    os.getenv("SEARCH_CACHE_VOLATILE_TTL_SECONDS", str(24 * 3600))
+)
+SEARCH_CACHE_PURGE_INTERVAL_SECONDS = int(
+    os.getenv("SEARCH_CACHE_PURGE_INTERVAL_SECONDS", "3600")
+)
+
+# Queries about moving targets (latest versions, prices, "this year") go stale
+# much faster than e.g. a library's original release date.
+_VOLATILE_TERMS = re.compile(
+    r"\b(latest|current|currently|recent|recently|today|now|newest|upcoming|"
+    r"this (week|month|year)|price|pricing|stock)\b"
+)
+_NON_QUERY_CHARS = re.compile(r"[^\w\s.+#-]")
+
+
+def normalize_query(query: str) -> str:
+    query = unicodedata.normalize("NFKC", query).lower()
+    query = _NON_QUERY_CHARS.sub(" ", query)
+    return " ".join(query.split()).strip(" .")
+
+
+def ttl_for_query(normalized_query: str) -> int:
+    if _VOLATILE_TERMS.search(normalized_query):
+        return SEARCH_CACHE_VOLATILE_TTL_SECONDS
+    return SEARCH_CACHE_TTL_SECONDS
+
+
+class SearchCache:
+    """SQLite-backed query -> answer cache shared by every review on the host."""
+
+    def __init__(self, path: str = SEARCH_CACHE_PATH):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS search_cache (
+                key TEXT PRIMARY KEY,
+                query TEXT NOT NULL,
+                answer TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                expires_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+        self._last_purge = 0.0
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT answer FROM search_cache WHERE key = ? AND expires_at > ?",
+                (key, time.time()),
+            ).fetchone()
+        return row[0] if row else None
+
+    def put(self, key: str, query: str, answer: str, ttl: int) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO search_cache VALUES (?, ?, ?, ?, ?)",
+                (key, query, answer, now, now + ttl),
+            )
+            self._conn.commit()
+        # Expired rows are only overwritten if the same query comes back, so
+        # sweep them out periodically from the write path.
+        if now - self._last_purge >= SEARCH_CACHE_PURGE_INTERVAL_SECONDS:
+            purged = self.purge_expired()
+            if purged:
+                logger.info(f"Purged {purged} expired search cache entries")
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            self._last_purge = time.time()
+            cursor = self._conn.execute(
+                "DELETE FROM search_cache WHERE expires_at <= ?", (self._last_purge,)
+            )
+            self._conn.commit()
+        return cursor.rowcount
+
+
+class CachedAgentTool(AgentTool):
+    """AgentTool that caches sub-agent answers and coalesces identical in-flight queries."""
+
+    def __init__(self, agent, cache: Optional[SearchCache] = None, **kwargs):
+        super().__init__(agent=agent, **kwargs)
+        self._cache = cache
+        self._in_flight: Dict[str, Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = {}
+
+    @property
+    def cache(self) -> SearchCache:
+        if self._cache is None:
+            self._cache = SearchCache()
+        return self._cache
+
+    async def run_async(self, *, args: Dict[str, Any], tool_context) -> Any:
+        query = str(args.get("request", ""))
+        normalized = normalize_query(query)
+        if not normalized:
+            return await super().run_async(args=args, tool_context=tool_context)
+
+        key = hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+        cached = await asyncio.to_thread(self.cache.get, key)
+        if cached is not None:
+            logger.info("Search cache hit for query: '%s'", normalized)
+            return cached
+
+        loop = asyncio.get_running_loop()
+        while (in_flight := self._in_flight.get(key)) and in_flight[0] is loop:
+            logger.info("Joining in-flight search for query: '%s'", normalized)
+            try:
+                return await asyncio.shield(in_flight[1])
+            except asyncio.CancelledError:
+                # Our own cancellation propagates. If only the leading run was
+                # cancelled (e.g. its review hit the hard time limit), run the
+                # search again, as the new leader or by joining one.
+                if not in_flight[1].cancelled() or asyncio.current_task().cancelling():
+                    raise
+                logger.info("In-flight search was cancelled, retrying query: '%s'", normalized)
+
+        future = loop.create_future()
+        self._in_flight[key] = (loop, future)
+        try:
+            result = await super().run_async(args=args, tool_context=tool_context)
+            future.set_result(result)
+        except asyncio.CancelledError:
+            # Never hand this review's cancellation to the reviews waiting on it.
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Retrieve it so an unawaited future does not log a warning.
+            future.exception()
+            raise
+        finally:
+            if self._in_flight.get(key, (None, None))[1] is future:
+                del self._in_flight[key]
+
+        if isinstance(result, str) and result.strip():
+            await asyncio.to_thread(
+                self.cache.put, key, query, result, ttl_for_query(normalized)
+            )
+        return result
@@ -1,10 +1,37 @@
+import os
+import asyncio
+import functools
 import requests
 from bs4 import BeautifulSoup
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from google.adk.tools import ToolContext
 
-from agent.source_manager import SourceManager
+from agent.source_manager import get_source_manager
 from agent.utils.logger import logger
 
+_tool_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("TOOL_THREAD_POOL_SIZE", "8")),
+    thread_name_prefix="tool",
+)
+
+
+def run_in_thread_pool(func):
+    """Wrap a blocking tool as a coroutine so ADK can run parallel calls concurrently.
+
+    functools.wraps keeps the name, docstring and signature that FunctionTool
+    uses to build the tool declaration.
+    """
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            _tool_executor, functools.partial(func, *args, **kwargs)
+        )
+
+    return wrapper
+
 
 def fetch_url_context(url: str) -> str:
     """Fetches context about the url and returns plain text"""
@@ -38,12 +65,13 @@ def fetch_url_context(url: str) -> str:
         return f"Error fetching content from {url}: {str(e)}"
 
 
-def retrieve_source_context(query: str) -> str:
+def retrieve_source_context(query: str, tool_context: ToolContext) -> str:
     """Retrieve context from documents provided as source"""
-    logger.info(f"Retrieving source context for query: '{query}'")
+    logger.info("Retrieving source context for query: '%s'", query)
+    blog_id = tool_context.state.get("blog_id")
 
     try:
-        source_manager = SourceManager()
+        source_manager = get_source_manager()
     except Exception as e:
         logger.critical(f"Failed to initialize SourceManager in tools: {e}")
         source_manager = None
@@ -52,12 +80,12 @@ def retrieve_source_context(query: str) -> str:
         logger.error("SourceManager not initialized")
         return "Error: Knowledge base unavailable."
 
-    results = source_manager.search_sources(query, k=5)
+    results = source_manager.search_sources(query, k=5, blog_id=blog_id)
     if not results:
         logger.info("No relevant source context found")
         return "No relevant source context found."
 
-    logger.debug(f"Returning {len(results)} chunks of context")
+    logger.debug("Returning %d chunks of context", len(results))
     return "\n---\n".join(results)
 
 
@@ -67,5 +95,5 @@ def get_current_datetime() -> str:
     now = datetime.now()
     iso_format = now.isoformat()
     human_format = now.strftime("%A, %B %d, %Y at %I:%M:%S %p")
-    logger.debug(f"Current datetime: {iso_format}")
+    logger.debug("Current datetime: %s", iso_format)
     return f"Current date and time: {human_format} (ISO: {iso_format})"
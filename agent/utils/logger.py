@@ -1,28 +1,115 @@
+import atexit
+import json
 import logging
+import os
+import queue
 import sys
+import threading
+import time
 from pathlib import Path
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Dict, Optional, Tuple, Union
+
+# Attributes every LogRecord carries; anything else came in through `extra=`.
+_RESERVED_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "timestamp": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "file": record.filename,
+            "line": record.lineno,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str)
+
+
+class CallSiteRateLimitFilter(logging.Filter):
+    """Lets at most `limit` records per call site through every `interval` seconds.
+
+    Only records below WARNING are throttled; the first record let through after
+    a throttled window carries a `suppressed` count.
+    """
+
+    def __init__(self, limit: int, interval: float):
+        super().__init__()
+        self.limit = limit
+        self.interval = interval
+        self._windows: Dict[Tuple[str, int], list] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.limit <= 0 or record.levelno >= logging.WARNING:
+            return True
+
+        key = (record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.setdefault(key, [now, 0, 0])
+            if now - window[0] >= self.interval:
+                suppressed = window[2]
+                window[:] = [now, 0, 0]
+                if suppressed:
+                    record.suppressed = suppressed
+            if window[1] >= self.limit:
+                window[2] += 1
+                return False
+            window[1] += 1
+        return True
+
+
+class LocalQueueHandler(QueueHandler):
+    """QueueHandler for an in-process queue: enqueues records unformatted.
+
+    The stock `prepare` formats the message on the caller's thread and drops
+    exc_info so records can be pickled. Nothing is pickled here, so the
+    listener thread formats the record, traceback included.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
 
 
 def setup_logger(
-    name: str = "peer_review_agent", log_level: int = logging.INFO
+    name: str = "peer_review_agent", log_level: Optional[Union[int, str]] = None
 ) -> logging.Logger:
+    """Configure a logger whose handlers run on a background listener thread.
+
+    Callers only pay for the filter check and a queue put; message and
+    traceback formatting and the console/file I/O happen on the QueueListener
+    thread. Configured through
+    LOG_LEVEL, LOG_FORMAT (json|text), LOG_DIR, LOG_RATE_LIMIT and
+    LOG_RATE_LIMIT_INTERVAL.
+    """
     logger = logging.getLogger(name)
+    if log_level is None:
+        log_level = os.getenv("LOG_LEVEL", "INFO").upper()
     logger.setLevel(log_level)
 
     if logger.hasHandlers():
         return logger
 
-    log_dir = Path("logs")
+    log_dir = Path(os.getenv("LOG_DIR", "logs"))
     log_dir.mkdir(exist_ok=True)
 
-    formatter = logging.Formatter(
-        "%(asctime)s - %(name)s - %(levelname)s - [%(filename)s:%(lineno)d] - %(message)s"
-    )
+    if os.getenv("LOG_FORMAT", "json").lower() == "json":
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter(
+            "%(asctime)s - %(name)s - %(levelname)s - [%(filename)s:%(lineno)d] - %(message)s"
+        )
 
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
 
     file_handler = RotatingFileHandler(
         log_dir / "app.log",
@@ -30,7 +117,23 @@ def setup_logger(
         backupCount=5,
     )
     file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = LocalQueueHandler(log_queue)
+    queue_handler.addFilter(
+        CallSiteRateLimitFilter(
+            limit=int(os.getenv("LOG_RATE_LIMIT", "20")),
+            interval=float(os.getenv("LOG_RATE_LIMIT_INTERVAL", "10")),
+        )
+    )
+    logger.addHandler(queue_handler)
+    logger.propagate = False
+
+    listener = QueueListener(
+        log_queue, console_handler, file_handler, respect_handler_level=True
+    )
+    listener.start()
+    atexit.register(listener.stop)
 
     return logger
 
@@ -1,15 +1,62 @@
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+from typing import BinaryIO, Optional, Union
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, LongTable, TableStyle
 from reportlab.lib.styles import getSampleStyleSheet
 from agent.schemas import PeerReviewReport
 from agent.utils.logger import logger
 
-def generate_pdf(report: PeerReviewReport, filename: str):
-    """Generates a PDF report from the PeerReviewReport object."""
-    logger.info(f"Generating PDF report: {filename}")
+PDF_CACHE_SIZE = int(os.getenv("PDF_CACHE_SIZE", "32"))
+# Rows per table segment; long line-by-line sections are emitted as several
+# LongTables so reportlab never has to lay out one giant table at once.
+TABLE_SEGMENT_ROWS = 200
+
+_pdf_cache: "OrderedDict[str, bytes]" = OrderedDict()
+_pdf_cache_lock = threading.Lock()
+
+
+def report_hash(report: PeerReviewReport) -> str:
+    return hashlib.sha256(report.model_dump_json().encode("utf-8")).hexdigest()
+
+
+def generate_pdf(
+    report: PeerReviewReport, output: Optional[Union[str, BinaryIO]] = None
+) -> bytes:
+    """Renders the PeerReviewReport to PDF bytes, optionally writing them to a filename or stream."""
+    key = report_hash(report)
+    with _pdf_cache_lock:
+        pdf_bytes = _pdf_cache.get(key)
+        if pdf_bytes is not None:
+            _pdf_cache.move_to_end(key)
+
+    if pdf_bytes is None:
+        pdf_bytes = _render_pdf(report)
+        with _pdf_cache_lock:
+            _pdf_cache[key] = pdf_bytes
+            while len(_pdf_cache) > PDF_CACHE_SIZE:
+                _pdf_cache.popitem(last=False)
+    else:
+        logger.debug(f"Serving cached PDF for report {key[:12]}")
+
+    if isinstance(output, str):
+        with open(output, "wb") as f:
+            f.write(pdf_bytes)
+    elif output is not None:
+        output.write(pdf_bytes)
+
+    return pdf_bytes
+
+
+def _render_pdf(report: PeerReviewReport) -> bytes:
+    logger.info("Generating PDF report")
     try:
-        doc = SimpleDocTemplate(filename, pagesize=letter)
+        buffer = io.BytesIO()
+        doc = SimpleDocTemplate(buffer, pagesize=letter)
         styles = getSampleStyleSheet()
         story = []
 
@@ -28,6 +75,13 @@ def generate_pdf(report: PeerReviewReport, filename: str):
         story.append(Paragraph(report.confidential_recommendation, styles['Normal']))
         story.append(Spacer(1, 12))
 
+        if report.budgets_exhausted:
+            story.append(Paragraph(
+                f"<i>Review stopped early, budgets exhausted: {', '.join(report.budgets_exhausted)}</i>",
+                styles['Normal'],
+            ))
+            story.append(Spacer(1, 12))
+
         # Major Issues
         if report.major_issues:
             story.append(Paragraph("<b>Major Issues</b>", styles['Heading2']))
@@ -47,25 +101,31 @@ def generate_pdf(report: PeerReviewReport, filename: str):
         # Line-by-Line Comments
         if report.line_by_line_comments:
             story.append(Paragraph("<b>Line-by-Line Comments</b>", styles['Heading2']))
-            data = [["Original Text", "Comment"]]
-            for comment in report.line_by_line_comments:
-                data.append([Paragraph(comment.original_text, styles['Normal']), 
-                             Paragraph(comment.comment, styles['Normal'])])
-            
-            table = Table(data, colWidths=[250, 250])
-            table.setStyle(TableStyle([
+            header = ["Original Text", "Comment"]
+            rows = [
+                [Paragraph(comment.original_text, styles['Normal']),
+                 Paragraph(comment.comment, styles['Normal'])]
+                for comment in report.line_by_line_comments
+            ]
+            table_style = TableStyle([
                 ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
                 ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
                 ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+                ('VALIGN', (0, 0), (-1, -1), 'TOP'),
                 ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
                 ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
                 ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
                 ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ]))
-            story.append(table)
+            ])
+            for start in range(0, len(rows), TABLE_SEGMENT_ROWS):
+                segment = [header] + rows[start:start + TABLE_SEGMENT_ROWS]
+                table = LongTable(segment, colWidths=[250, 250], repeatRows=1, splitByRow=1)
+                table.setStyle(table_style)
+                story.append(table)
 
         doc.build(story)
         logger.info("PDF generated successfully")
+        return buffer.getvalue()
     except Exception as e:
         logger.error(f"PDF generation failed: {e}")
         raise
@@ -0,0 +1,23 @@
+import os
+
+from agent.vector_stores.base import VectorRecord, VectorStoreBackend, matches_where
+
+VECTOR_STORE_BACKEND = os.getenv("VECTOR_STORE_BACKEND", "chroma").lower()
+
+
+def get_backend(
+    persist_directory: str, collection_name: str, backend: str = VECTOR_STORE_BACKEND
+) -> VectorStoreBackend:
+    if backend == "chroma":
+        from agent.vector_stores.chroma_backend import ChromaBackend
+
+        return ChromaBackend(persist_directory, collection_name)
+    elif backend == "numpy":
+        from agent.vector_stores.numpy_backend import NumpyIndexBackend
+
+        return NumpyIndexBackend(persist_directory, collection_name)
+    else:
+        raise ValueError(f"Unsupported VECTOR_STORE_BACKEND: {backend}")
+
+
+__all__ = ["VectorRecord", "VectorStoreBackend", "get_backend", "matches_where"]
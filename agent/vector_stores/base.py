@@ -0,0 +1,112 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+
+Metadata = Dict[str, Any]
+Where = Optional[Dict[str, Any]]
+
+
+class VectorRecord(NamedTuple):
+    id: str
+    text: str
+    metadata: Metadata
+    distance: Optional[float] = None
+
+
+def matches_where(metadata: Metadata, where: Where) -> bool:
+    """Evaluate the subset of Chroma's `where` syntax the backends rely on.
+
+    Supports plain equality (`{"source": "a.md"}`), `$eq`, `$ne` and `$in`
+    operators, and `$and` / `$or` over lists of clauses.
+    """
+    if not where:
+        return True
+    for key, condition in where.items():
+        if key == "$and":
+            if not all(matches_where(metadata, clause) for clause in condition):
+                return False
+            continue
+        if key == "$or":
+            if not any(matches_where(metadata, clause) for clause in condition):
+                return False
+            continue
+
+        value = metadata.get(key)
+        if isinstance(condition, dict):
+            for op, operand in condition.items():
+                if op == "$eq" and value != operand:
+                    return False
+                if op == "$ne" and value == operand:
+                    return False
+                if op == "$in" and value not in operand:
+                    return False
+        elif value != condition:
+            return False
+    return True
+
+
+class VectorStoreBackend(ABC):
+    """Storage and nearest-neighbour search for pre-computed, normalized embeddings.
+
+    Distances are squared L2, so smaller is closer, matching Chroma's default.
+    """
+
+    @abstractmethod
+    def add(
+        self,
+        ids: Sequence[str],
+        texts: Sequence[str],
+        embeddings: Sequence[Sequence[float]],
+        metadatas: Sequence[Metadata],
+    ) -> None: ...
+
+    @abstractmethod
+    def upsert(
+        self,
+        ids: Sequence[str],
+        texts: Sequence[str],
+        embeddings: Sequence[Sequence[float]],
+        metadatas: Sequence[Metadata],
+    ) -> None: ...
+
+    @abstractmethod
+    def update_metadata(self, ids: Sequence[str], metadatas: Sequence[Metadata]) -> None: ...
+
+    @abstractmethod
+    def delete(self, ids: Optional[Sequence[str]] = None, where: Where = None) -> None: ...
+
+    @abstractmethod
+    def search_batch(
+        self, embeddings: Sequence[Sequence[float]], k: int, where: Where = None
+    ) -> List[List[VectorRecord]]: ...
+
+    @abstractmethod
+    def get(self, where: Where = None) -> List[VectorRecord]: ...
+
+    @abstractmethod
+    def count(self) -> int: ...
+
+    def search(
+        self, embedding: Sequence[float], k: int, where: Where = None
+    ) -> List[VectorRecord]:
+        return self.search_batch([embedding], k, where=where)[0]
+
+    def list_sources(self, where: Where = None) -> List[str]:
+        return sorted(
+            {r.metadata["source"] for r in self.get(where) if "source" in r.metadata}
+        )
+
+    def get_by_source(self, source_name: str, where: Where = None) -> List[VectorRecord]:
+        condition = {"source": source_name}
+        if where:
+            condition = {"$and": [condition, where]}
+        records = self.get(condition)
+        return sorted(records, key=lambda r: r.metadata.get("chunk_index", 0))
+
+    def backfill_metadata(self, key: str, value: Any) -> int:
+        """Set `key` to `value` on every record that lacks it; returns the count."""
+        missing = [r for r in self.get() if key not in r.metadata]
+        if missing:
+            self.update_metadata(
+                [r.id for r in missing], [{**r.metadata, key: value} for r in missing]
+            )
+        return len(missing)
@@ -0,0 +1,153 @@
+"""Benchmarks for the vector store backends.
+
+Run with:
+
+    python -m agent.vector_stores.benchmark --backends chroma numpy --rows 20000
+
+Each backend is benchmarked on synthetic clustered embeddings for ingest
+throughput, search latency, recall@k against exact search (unfiltered and
+within a small and a large project namespace), disk size and peak RSS growth.
+Correctness is covered by tests/test_vector_backends.py.
+"""
+
+import argparse
+import resource
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from agent.vector_stores import VectorStoreBackend, get_backend
+
+BackendFactory = Callable[[str], VectorStoreBackend]
+# Synthetic tenants for filtered search: a small project (every 500th row) and
+# a larger one (every 10th row); everything else is shared.
+TENANTS = {"project:small": 500, "project:large": 10}
+
+
+def _unit(vectors: np.ndarray) -> np.ndarray:
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _clustered_embeddings(rows: int, dim: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(size=(max(1, rows // 50), dim)).astype(np.float32)
+    labels = rng.integers(len(centres), size=rows)
+    noise = rng.normal(scale=0.4, size=(rows, dim)).astype(np.float32)
+    return _unit(centres[labels] + noise).astype(np.float32)
+
+
+def _namespace(row: int) -> str:
+    for namespace, every in TENANTS.items():
+        if row % every == 0:
+            return namespace
+    return "shared"
+
+
+def _recall(backend: VectorStoreBackend, query_vectors, exact, k: int, where=None) -> float:
+    recalls = []
+    for i, query in enumerate(query_vectors):
+        hits = backend.search(query.tolist(), k=k, where=where)
+        found = {int(hit.id.split("_")[1]) for hit in hits}
+        recalls.append(len(found & set(exact[i].tolist())) / k)
+    return float(np.mean(recalls))
+
+
+def _directory_size(path: str) -> int:
+    return sum(f.stat().st_size for f in Path(path).rglob("*") if f.is_file())
+
+
+def _peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def benchmark(
+    make_backend: BackendFactory,
+    rows: int,
+    dim: int,
+    queries: int,
+    k: int,
+    batch_size: int = 1000,
+) -> Dict[str, float]:
+    corpus = _clustered_embeddings(rows, dim)
+    query_vectors = _clustered_embeddings(queries, dim, seed=1)
+    exact = np.argsort(-(query_vectors @ corpus.T), axis=1)[:, :k]
+
+    directory = tempfile.mkdtemp()
+    try:
+        rss_before = _peak_rss_mb()
+        backend = make_backend(directory)
+
+        started = time.perf_counter()
+        for start in range(0, rows, batch_size):
+            stop = min(start + batch_size, rows)
+            backend.add(
+                ids=[f"doc_{i}" for i in range(start, stop)],
+                texts=[f"chunk {i}" for i in range(start, stop)],
+                embeddings=corpus[start:stop].tolist(),
+                metadatas=[
+                    {"source": f"source_{i % 100}.md", "chunk_index": i, "namespace": _namespace(i)}
+                    for i in range(start, stop)
+                ],
+            )
+        ingest_seconds = time.perf_counter() - started
+
+        backend.search(query_vectors[0].tolist(), k=k)  # warm indexes and caches
+        latencies: List[float] = []
+        for query in query_vectors:
+            started = time.perf_counter()
+            backend.search(query.tolist(), k=k)
+            latencies.append((time.perf_counter() - started) * 1000)
+        tenant_recalls = {}
+        for namespace in TENANTS:
+            # Exact neighbours among the tenant's rows, as global row numbers.
+            tenant_rows = np.array([i for i in range(rows) if _namespace(i) == namespace])
+            tenant_exact = tenant_rows[
+                np.argsort(-(query_vectors @ corpus[tenant_rows].T), axis=1)[:, :k]
+            ]
+            tenant_recalls[f"{namespace.split(':')[1]}_tenant_recall@{k}"] = _recall(
+                backend, query_vectors, tenant_exact, k, where={"namespace": namespace}
+            )
+
+        started = time.perf_counter()
+        backend.search_batch(query_vectors.tolist(), k=k)
+        batch_ms = (time.perf_counter() - started) * 1000
+
+        return {
+            "ingest_rows_per_s": rows / ingest_seconds,
+            "search_p50_ms": float(np.percentile(latencies, 50)),
+            "search_p95_ms": float(np.percentile(latencies, 95)),
+            "batch_search_ms": batch_ms,
+            f"recall@{k}": _recall(backend, query_vectors, exact, k),
+            **tenant_recalls,
+            "disk_mb": _directory_size(directory) / 1024 / 1024,
+            "peak_rss_growth_mb": _peak_rss_mb() - rss_before,
+        }
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backends", nargs="+", default=["chroma", "numpy"])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    args = parser.parse_args()
+
+    for name in args.backends:
+
+        def make_backend(directory: str, name: str = name) -> VectorStoreBackend:
+            return get_backend(directory, "benchmark", backend=name)
+
+        results = benchmark(make_backend, args.rows, args.dim, args.queries, args.k)
+        for metric, value in results.items():
+            print(f"[{name}] {metric}: {value:.3f}")
+
+
+if __name__ == "__main__":
+    main()
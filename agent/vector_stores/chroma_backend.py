@@ -0,0 +1,110 @@
+from typing import List, Optional, Sequence
+
+import chromadb
+
+from agent.vector_stores.base import Metadata, VectorRecord, VectorStoreBackend, Where
+
+
+class ChromaBackend(VectorStoreBackend):
+    """Persistent Chroma collection, compatible with stores written by langchain's Chroma."""
+
+    def __init__(self, persist_directory: str, collection_name: str):
+        self.client = chromadb.PersistentClient(path=persist_directory)
+        self.collection = self.client.get_or_create_collection(collection_name)
+
+    def add(
+        self,
+        ids: Sequence[str],
+        texts: Sequence[str],
+        embeddings: Sequence[Sequence[float]],
+        metadatas: Sequence[Metadata],
+    ) -> None:
+        self.collection.add(
+            ids=list(ids),
+            documents=list(texts),
+            embeddings=[list(e) for e in embeddings],
+            metadatas=list(metadatas),
+        )
+
+    def upsert(
+        self,
+        ids: Sequence[str],
+        texts: Sequence[str],
+        embeddings: Sequence[Sequence[float]],
+        metadatas: Sequence[Metadata],
+    ) -> None:
+        self.collection.upsert(
+            ids=list(ids),
+            documents=list(texts),
+            embeddings=[list(e) for e in embeddings],
+            metadatas=list(metadatas),
+        )
+
+    def update_metadata(self, ids: Sequence[str], metadatas: Sequence[Metadata]) -> None:
+        self.collection.update(ids=list(ids), metadatas=list(metadatas))
+
+    def delete(self, ids: Optional[Sequence[str]] = None, where: Where = None) -> None:
+        if not ids and not where:
+            return
+        self.collection.delete(ids=list(ids) if ids else None, where=where or None)
+
+    def search_batch(
+        self, embeddings: Sequence[Sequence[float]], k: int, where: Where = None
+    ) -> List[List[VectorRecord]]:
+        if not embeddings:
+            return []
+        count = self.collection.count()
+        if count == 0:
+            return [[] for _ in embeddings]
+
+        result = self.collection.query(
+            query_embeddings=[list(e) for e in embeddings],
+            n_results=min(k, count),
+            where=where or None,
+            include=["documents", "metadatas", "distances"],
+        )
+        return [
+            [
+                VectorRecord(id_, text, meta or {}, distance)
+                for id_, text, meta, distance in zip(ids, texts, metas, distances)
+            ]
+            for ids, texts, metas, distances in zip(
+                result["ids"],
+                result["documents"],
+                result["metadatas"],
+                result["distances"],
+            )
+        ]
+
+    def get(self, where: Where = None) -> List[VectorRecord]:
+        result = self.collection.get(
+            where=where or None, include=["documents", "metadatas"]
+        )
+        return [
+            VectorRecord(id_, text, meta or {})
+            for id_, text, meta in zip(
+                result["ids"], result["documents"], result["metadatas"]
+            )
+        ]
+
+    def list_sources(self, where: Where = None) -> List[str]:
+        result = self.collection.get(where=where or None, include=["metadatas"])
+        return sorted(
+            {meta["source"] for meta in result["metadatas"] or [] if meta and "source" in meta}
+        )
+
+    def backfill_metadata(self, key: str, value) -> int:
+        result = self.collection.get(include=["metadatas"])
+        missing = [
+            (id_, meta or {})
+            for id_, meta in zip(result["ids"], result["metadatas"])
+            if key not in (meta or {})
+        ]
+        if missing:
+            self.update_metadata(
+                [id_ for id_, _ in missing], [{**meta, key: value} for _, meta in missing]
+            )
+        return len(missing)
+
+    def count(self) -> int:
+        return self.collection.count()
@@ -0,0 +1,430 @@
+import os
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from agent.utils.logger import logger
+from agent.vector_stores.base import (
+    Metadata,
+    VectorRecord,
+    VectorStoreBackend,
+    Where,
+    matches_where,
+)
+
+NUMPY_INDEX_NPROBE = int(os.getenv("NUMPY_INDEX_NPROBE", "8"))
+NUMPY_INDEX_IVF_MIN_ROWS = int(os.getenv("NUMPY_INDEX_IVF_MIN_ROWS", "20000"))
+KMEANS_ITERATIONS = 10
+KMEANS_SAMPLES_PER_LIST = 64
+BLOCK_ROWS = 65536
+WHERE_MASK_CACHE_SIZE = 64
+
+
+class NumpyIndexBackend(VectorStoreBackend):
+    """In-process index over normalized float32 vectors in a memory-mapped array.
+
+    Vectors live in `vectors.f32` (one row per chunk, append-only) and chunk
+    text/metadata in a SQLite sidecar. Deletes and upserts tombstone rows.
+    Small collections are searched exactly. From NUMPY_INDEX_IVF_MIN_ROWS live
+    rows on, an IVF index is trained with k-means, and each search scans the
+    NUMPY_INDEX_NPROBE closest lists plus any rows added since training. A
+    `where` filter matching fewer rows than that is searched exactly; otherwise
+    more lists are probed until k matching rows are found.
+    """
+
+    def __init__(
+        self,
+        persist_directory: str,
+        collection_name: str,
+        nprobe: int = NUMPY_INDEX_NPROBE,
+        ivf_min_rows: int = NUMPY_INDEX_IVF_MIN_ROWS,
+    ):
+        self.path = Path(persist_directory) / f"{collection_name}.npindex"
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.nprobe = nprobe
+        self.ivf_min_rows = ivf_min_rows
+
+        self._lock = threading.RLock()
+        self._db = sqlite3.connect(self.path / "metadata.db", check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS chunks (
+                row INTEGER PRIMARY KEY,
+                id TEXT NOT NULL,
+                text TEXT NOT NULL,
+                metadata TEXT NOT NULL,
+                alive INTEGER NOT NULL DEFAULT 1
+            )
+            """
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT)"
+        )
+        self._db.commit()
+
+        self._vectors: Optional[np.memmap] = None
+        self._capacity = 0
+        self._dim: Optional[int] = None
+        self._ids: List[str] = []
+        self._metadatas: List[Metadata] = []
+        self._alive = np.zeros(0, dtype=bool)
+        self._id_to_row: Dict[str, int] = {}
+        self._version = 0
+        # Masks for recent `where` filters, valid for `_where_masks_version` only.
+        self._where_masks: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._where_masks_version = 0
+        self._ivf = None
+        self._load()
+
+    @property
+    def _vector_file(self) -> Path:
+        return self.path / "vectors.f32"
+
+    def _load(self) -> None:
+        row = self._db.execute("SELECT value FROM settings WHERE key = 'dim'").fetchone()
+        if row:
+            self._dim = int(row[0])
+            self._open_vectors()
+
+        alive = []
+        for row_id, id_, metadata, is_alive in self._db.execute(
+            "SELECT row, id, metadata, alive FROM chunks ORDER BY row"
+        ):
+            self._ids.append(id_)
+            self._metadatas.append(json.loads(metadata))
+            alive.append(bool(is_alive))
+            if is_alive:
+                self._id_to_row[id_] = row_id
+        self._alive = np.array(alive, dtype=bool)
+        logger.info(
+            f"Loaded numpy index at {self.path} with {len(self._id_to_row)} live rows"
+        )
+
+    def _open_vectors(self) -> None:
+        if not self._vector_file.exists():
+            self._vector_file.touch()
+        row_bytes = self._dim * 4
+        self._capacity = self._vector_file.stat().st_size // row_bytes
+        self._vectors = (
+            np.memmap(
+                self._vector_file,
+                dtype=np.float32,
+                mode="r+",
+                shape=(self._capacity, self._dim),
+            )
+            if self._capacity
+            else None
+        )
+
+    def _ensure_capacity(self, rows_needed: int) -> None:
+        if rows_needed <= self._capacity:
+            return
+        new_capacity = max(rows_needed, self._capacity * 2, 1024)
+        if self._vectors is not None:
+            self._vectors.flush()
+            self._vectors = None
+        with open(self._vector_file, "r+b") as f:
+            f.truncate(new_capacity * self._dim * 4)
+        self._open_vectors()
+
+    @staticmethod
+    def _normalize(embeddings: Sequence[Sequence[float]]) -> np.ndarray:
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        if vectors.ndim == 1:
+            vectors = vectors[None, :]
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def _append(
+        self,
+        ids: Sequence[str],
+        texts: Sequence[str],
+        embeddings: Sequence[Sequence[float]],
+        metadatas: Sequence[Metadata],
+    ) -> None:
+        if not ids:
+            return
+        vectors = self._normalize(embeddings)
+        self._check_dimension(vectors)
+        if self._dim is None:
+            self._dim = vectors.shape[1]
+            self._db.execute(
+                "INSERT OR REPLACE INTO settings VALUES ('dim', ?)", (str(self._dim),)
+            )
+            self._open_vectors()
+
+        start = len(self._ids)
+        self._ensure_capacity(start + len(ids))
+        self._vectors[start : start + len(ids)] = vectors
+        self._vectors.flush()
+
+        self._db.executemany(
+            "INSERT INTO chunks (row, id, text, metadata, alive) VALUES (?, ?, ?, ?, 1)",
+            [
+                (start + i, id_, text, json.dumps(meta or {}))
+                for i, (id_, text, meta) in enumerate(zip(ids, texts, metadatas))
+            ],
+        )
+        self._db.commit()
+
+        for i, (id_, meta) in enumerate(zip(ids, metadatas)):
+            self._ids.append(id_)
+            self._metadatas.append(dict(meta or {}))
+            self._id_to_row[id_] = start + i
+        self._alive = np.concatenate([self._alive, np.ones(len(ids), dtype=bool)])
+        self._version += 1
+
+    def _check_dimension(self, vectors: np.ndarray) -> None:
+        if self._dim is not None and vectors.shape[1] != self._dim:
+            raise ValueError(
+                f"Embedding dimension {vectors.shape[1]} does not match index dimension {self._dim}"
+            )
+
+    def _tombstone(self, rows: List[int]) -> None:
+        if not rows:
+            return
+        self._alive[rows] = False
+        for row in rows:
+            self._id_to_row.pop(self._ids[row], None)
+        self._db.executemany(
+            "UPDATE chunks SET alive = 0 WHERE row = ?", [(row,) for row in rows]
+        )
+        self._db.commit()
+        self._version += 1
+
+    def add(
+        self,
+        ids: Sequence[str],
+        texts: Sequence[str],
+        embeddings: Sequence[Sequence[float]],
+        metadatas: Sequence[Metadata],
+    ) -> None:
+        with self._lock:
+            # Like Chroma, adding an id that already exists is a no-op.
+            keep = [i for i, id_ in enumerate(ids) if id_ not in self._id_to_row]
+            if len(keep) < len(ids):
+                logger.warning(f"Skipping {len(ids) - len(keep)} existing ids on add")
+            self._append(
+                [ids[i] for i in keep],
+                [texts[i] for i in keep],
+                [embeddings[i] for i in keep],
+                [metadatas[i] for i in keep],
+            )
+
+    def upsert(
+        self,
+        ids: Sequence[str],
+        texts: Sequence[str],
+        embeddings: Sequence[Sequence[float]],
+        metadatas: Sequence[Metadata],
+    ) -> None:
+        with self._lock:
+            # Reject bad embeddings before the old rows are tombstoned.
+            if ids:
+                self._check_dimension(self._normalize(embeddings))
+            self._tombstone([self._id_to_row[id_] for id_ in ids if id_ in self._id_to_row])
+            self._append(ids, texts, embeddings, metadatas)
+
+    def update_metadata(self, ids: Sequence[str], metadatas: Sequence[Metadata]) -> None:
+        with self._lock:
+            updates = [
+                (self._id_to_row[id_], dict(meta or {}))
+                for id_, meta in zip(ids, metadatas)
+                if id_ in self._id_to_row
+            ]
+            for row, meta in updates:
+                self._metadatas[row] = meta
+            self._db.executemany(
+                "UPDATE chunks SET metadata = ? WHERE row = ?",
+                [(json.dumps(meta), row) for row, meta in updates],
+            )
+            self._db.commit()
+            self._version += 1
+
+    def delete(self, ids: Optional[Sequence[str]] = None, where: Where = None) -> None:
+        if not ids and not where:
+            return
+        with self._lock:
+            mask = self._candidate_mask(where)
+            if ids:
+                id_mask = np.zeros_like(mask)
+                id_mask[[self._id_to_row[id_] for id_ in ids if id_ in self._id_to_row]] = True
+                mask &= id_mask
+            self._tombstone(np.flatnonzero(mask).tolist())
+
+    def _candidate_mask(self, where: Where) -> np.ndarray:
+        if not where:
+            return self._alive.copy()
+        if self._where_masks_version != self._version:
+            self._where_masks.clear()
+            self._where_masks_version = self._version
+        key = json.dumps(where, sort_keys=True, default=str)
+        cached = self._where_masks.get(key)
+        if cached is not None:
+            self._where_masks.move_to_end(key)
+            return cached.copy()
+        mask = np.fromiter(
+            (matches_where(meta, where) for meta in self._metadatas),
+            dtype=bool,
+            count=len(self._metadatas),
+        )
+        mask &= self._alive
+        self._where_masks[key] = mask
+        if len(self._where_masks) > WHERE_MASK_CACHE_SIZE:
+            self._where_masks.popitem(last=False)
+        return mask.copy()
+
+    def _build_ivf(self) -> None:
+        live_rows = np.flatnonzero(self._alive)
+        nlist = max(1, int(np.sqrt(len(live_rows))))
+        rng = np.random.default_rng(0)
+        sample_rows = np.sort(
+            rng.choice(
+                live_rows,
+                size=min(len(live_rows), nlist * KMEANS_SAMPLES_PER_LIST),
+                replace=False,
+            )
+        )
+        sample = np.asarray(self._vectors[sample_rows])
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+
+        for _ in range(KMEANS_ITERATIONS):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(nlist):
+                members = sample[assignment == c]
+                if len(members):
+                    centroids[c] = members.mean(axis=0)
+                else:
+                    centroids[c] = sample[rng.integers(len(sample))]
+            centroids /= np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12)
+
+        trained_rows = len(self._ids)
+        assignments = np.empty(trained_rows, dtype=np.int32)
+        for start in range(0, trained_rows, BLOCK_ROWS):
+            block = np.asarray(self._vectors[start : min(start + BLOCK_ROWS, trained_rows)])
+            assignments[start : start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+
+        order = np.argsort(assignments, kind="stable")
+        bounds = np.searchsorted(assignments[order], np.arange(nlist + 1))
+        lists = [order[bounds[c] : bounds[c + 1]] for c in range(nlist)]
+        self._ivf = (centroids, lists, trained_rows)
+        logger.info(f"Trained IVF index with {nlist} lists over {trained_rows} rows")
+
+    def _maybe_build_ivf(self) -> None:
+        live = int(self._alive.sum())
+        if live < self.ivf_min_rows:
+            self._ivf = None
+            return
+        if self._ivf is None or len(self._ids) > 2 * self._ivf[2]:
+            self._build_ivf()
+
+    def _exact_rows(self, mask: np.ndarray) -> Optional[np.ndarray]:
+        """Rows to scan exactly, or None to probe the IVF lists per query.
+
+        A filter matching fewer rows than the probed lists hold is scanned
+        exactly: that is cheaper, and probing would miss most matching rows.
+        """
+        if self._ivf is None:
+            return np.flatnonzero(mask)
+        _, lists, trained_rows = self._ivf
+        probed_rows = min(self.nprobe, len(lists)) * trained_rows / len(lists)
+        matching = int(mask.sum())
+        return np.flatnonzero(mask) if matching <= probed_rows else None
+
+    def _probe_rows(self, query: np.ndarray, mask: np.ndarray, k: int) -> np.ndarray:
+        """Matching rows in the lists closest to `query`, plus rows added since
+        training; probes more lists until at least k rows match."""
+        centroids, lists, trained_rows = self._ivf
+        order = np.argsort(-(centroids @ query))
+        recent = np.arange(trained_rows, len(self._ids))
+        nprobe = min(self.nprobe, len(lists))
+        while True:
+            rows = np.concatenate([lists[c] for c in order[:nprobe]] + [recent])
+            rows = rows[mask[rows]]
+            if len(rows) >= k or nprobe >= len(lists):
+                return rows
+            nprobe = min(len(lists), nprobe * 2)
+
+    def search_batch(
+        self, embeddings: Sequence[Sequence[float]], k: int, where: Where = None
+    ) -> List[List[VectorRecord]]:
+        if not len(embeddings):
+            return []
+        with self._lock:
+            if self._vectors is None or not self._alive.any():
+                return [[] for _ in embeddings]
+            queries = self._normalize(embeddings)
+            mask = self._candidate_mask(where)
+            self._maybe_build_ivf()
+            exact_rows = self._exact_rows(mask)
+
+            hits = []
+            for query in queries:
+                rows = exact_rows if exact_rows is not None else self._probe_rows(query, mask, k)
+                if not len(rows):
+                    hits.append([])
+                    continue
+                scores = np.asarray(self._vectors[rows]) @ query
+                top = min(k, len(rows))
+                best = np.argpartition(-scores, top - 1)[:top]
+                best = best[np.argsort(-scores[best])]
+                hits.append([(int(rows[i]), float(scores[i])) for i in best])
+
+            texts = self._fetch_texts({row for query_hits in hits for row, _ in query_hits})
+            return [
+                [
+                    VectorRecord(
+                        self._ids[row],
+                        texts[row],
+                        self._metadatas[row],
+                        max(0.0, 2.0 - 2.0 * score),
+                    )
+                    for row, score in query_hits
+                ]
+                for query_hits in hits
+            ]
+
+    def _fetch_texts(self, rows) -> Dict[int, str]:
+        rows = list(rows)
+        texts = {}
+        # Stay under SQLite's bound-parameter limit.
+        for start in range(0, len(rows), 500):
+            batch = rows[start : start + 500]
+            placeholders = ",".join("?" * len(batch))
+            texts.update(
+                self._db.execute(
+                    f"SELECT row, text FROM chunks WHERE row IN ({placeholders})", batch
+                ).fetchall()
+            )
+        return texts
+
+    def get(self, where: Where = None) -> List[VectorRecord]:
+        with self._lock:
+            rows = np.flatnonzero(self._candidate_mask(where)).tolist()
+            texts = self._fetch_texts(rows)
+            return [
+                VectorRecord(self._ids[row], texts[row], self._metadatas[row])
+                for row in rows
+            ]
+
+    def list_sources(self, where: Where = None) -> List[str]:
+        with self._lock:
+            rows = np.flatnonzero(self._candidate_mask(where))
+            return sorted(
+                {
+                    self._metadatas[row]["source"]
+                    for row in rows
+                    if "source" in self._metadatas[row]
+                }
+            )
+
+    def count(self) -> int:
+        with self._lock:
+            return len(self._id_to_row)
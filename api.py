@@ -0,0 +1,200 @@
+import os
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+
+import uvicorn
+from dotenv import load_dotenv
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel, Field
+
+from agent.agent import model
+from agent.models import ProviderRouter
+from agent.reviewer import run_peer_review_async
+from agent.schemas import PeerReviewReport
+from agent.source_manager import get_source_manager
+from agent.memory import get_memory_manager
+from agent.utils.logger import logger
+from agent.utils.pdf_generator import generate_pdf
+
+load_dotenv()
+
+MAX_CONCURRENT_REVIEWS = int(os.getenv("API_MAX_CONCURRENT_REVIEWS", "4"))
+MAX_CONCURRENT_REQUESTS = int(os.getenv("API_MAX_CONCURRENT_REQUESTS", "16"))
+RETRY_AFTER_SECONDS = int(os.getenv("API_RETRY_AFTER_SECONDS", "5"))
+
+
+class ReviewRequest(BaseModel):
+    blog_id: str = Field(..., description="Project / blog identifier used for memory.")
+    content: str = Field(..., description="Blog content or a URL to fetch.")
+
+
+class SourceRequest(BaseModel):
+    source_name: str = Field(..., description="Name the source is stored under.")
+    content: str = Field(..., description="Raw text or markdown of the source.")
+    blog_id: Optional[str] = Field(
+        None, description="Project the source belongs to; omit to share it with every project."
+    )
+
+
+class SearchResponse(BaseModel):
+    query: str
+    results: List[str]
+
+
+class ConcurrencyLimiter:
+    """Caps in-flight requests and rejects new ones instead of queueing them."""
+
+    def __init__(self, name: str, limit: int):
+        self.name = name
+        self.limit = limit
+        self.in_flight = 0
+
+    @asynccontextmanager
+    async def slot(self):
+        if self.in_flight >= self.limit:
+            logger.warning(f"Rejecting request, {self.name} limiter saturated")
+            raise HTTPException(
+                status_code=429,
+                detail=f"Too many concurrent {self.name} requests",
+                headers={"Retry-After": str(RETRY_AFTER_SECONDS)},
+            )
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+
+
+review_limiter = ConcurrencyLimiter("review", MAX_CONCURRENT_REVIEWS)
+request_limiter = ConcurrencyLimiter("request", MAX_CONCURRENT_REQUESTS)
+
+readiness: Dict[str, bool] = {"source_manager": False, "memory_manager": False}
+startup_errors: Dict[str, str] = {}
+
+
+async def warm_resources() -> None:
+    for name, loader in (
+        ("source_manager", get_source_manager),
+        ("memory_manager", get_memory_manager),
+    ):
+        try:
+            await asyncio.to_thread(loader)
+            readiness[name] = True
+            logger.info(f"API resource ready: {name}")
+        except Exception as e:
+            startup_errors[name] = str(e)
+            logger.critical(f"Failed to warm {name}: {e}")
+
+
+def require_ready(*names: str) -> None:
+    missing = [name for name in names if not readiness[name]]
+    if missing:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Service not ready, still loading: {', '.join(missing)}",
+            headers={"Retry-After": str(RETRY_AFTER_SECONDS)},
+        )
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    warmup = asyncio.create_task(warm_resources())
+    yield
+    warmup.cancel()
+
+
+app = FastAPI(title="Peer Review Agent API", lifespan=lifespan)
+
+
+@app.get("/healthz")
+async def healthz():
+    return {"status": "ok"}
+
+
+@app.get("/readyz")
+async def readyz():
+    ready = all(readiness.values())
+    body = {
+        "ready": ready,
+        "resources": readiness,
+        "errors": startup_errors,
+        "reviews_in_flight": review_limiter.in_flight,
+    }
+    return JSONResponse(status_code=200 if ready else 503, content=body)
+
+
+@app.get("/providers")
+async def providers():
+    """Per-provider circuit state and latency stats when MODEL_FALLBACKS is set."""
+    if isinstance(model, ProviderRouter):
+        return model.stats()
+    return {}
+
+
+@app.post("/reviews", response_model=PeerReviewReport)
+async def create_review(request: ReviewRequest):
+    require_ready("source_manager", "memory_manager")
+    async with review_limiter.slot():
+        logger.info(f"API review requested for blog_id: {request.blog_id}")
+        try:
+            return await run_peer_review_async(request.blog_id, request.content)
+        except ValueError as e:
+            raise HTTPException(status_code=502, detail=str(e))
+
+
+@app.post("/sources", status_code=201)
+async def add_source(request: SourceRequest):
+    require_ready("source_manager")
+    if not request.content.strip():
+        raise HTTPException(status_code=422, detail="Source content is empty")
+    async with request_limiter.slot():
+        source_manager = get_source_manager()
+        stored = await asyncio.to_thread(
+            source_manager.add_source, request.content, request.source_name, request.blog_id
+        )
+        if not stored:
+            raise HTTPException(
+                status_code=500, detail=f"Failed to ingest source {request.source_name}"
+            )
+        return {"source_name": request.source_name, "blog_id": request.blog_id}
+
+
+@app.get("/sources", response_model=List[str])
+async def list_sources(blog_id: Optional[str] = None):
+    require_ready("source_manager")
+    async with request_limiter.slot():
+        return await asyncio.to_thread(get_source_manager().list_sources, blog_id)
+
+
+@app.get("/sources/search", response_model=SearchResponse)
+async def search_sources(query: str, k: int = 3, blog_id: Optional[str] = None):
+    require_ready("source_manager")
+    async with request_limiter.slot():
+        results = await asyncio.to_thread(
+            get_source_manager().search_sources, query, k, blog_id
+        )
+        return SearchResponse(query=query, results=results)
+
+
+@app.post("/reports/pdf")
+async def render_pdf(report: PeerReviewReport):
+    async with request_limiter.slot():
+        try:
+            pdf_bytes = await asyncio.to_thread(generate_pdf, report)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"PDF generation failed: {e}")
+        return Response(
+            content=pdf_bytes,
+            media_type="application/pdf",
+            headers={"Content-Disposition": 'attachment; filename="review_report.pdf"'},
+        )
+
+
+if __name__ == "__main__":
+    uvicorn.run(
+        "api:app",
+        host=os.getenv("API_HOST", "0.0.0.0"),
+        port=int(os.getenv("API_PORT", "8000")),
+    )
@@ -1,129 +1,17 @@
 import streamlit as st
-import tempfile
-import os
-import json
 from dotenv import load_dotenv
-import asyncio
-from google.adk.sessions import InMemorySessionService
-from google.adk.runners import Runner
-from google.genai import types as genai_types
-
-from agent.agent import peer_review_agent
-from agent.source_manager import SourceManager
-from agent.schemas import PeerReviewReport
-from agent.memory import MemoryManager
+
+from agent.reviewer import PeerReviewer, run_peer_review_async  # noqa: F401
+from agent.source_manager import get_source_manager
+from agent.memory import get_memory_manager
 from agent.utils.logger import logger
 from agent.utils.pdf_generator import generate_pdf
 
 load_dotenv()
 
 try:
-    source_manager = SourceManager()
-    memory_manager = MemoryManager()
-
-    async def run_peer_review_async(blog_id: str, content: str) -> PeerReviewReport:
-        logger.info(f"Starting async peer review for blog_id: {blog_id}")
-
-        memory_manager = await asyncio.to_thread(MemoryManager)
-
-        past_feedback = await asyncio.to_thread(
-            memory_manager.get_blog_history, blog_id
-        )
-        past_feedback_text = (
-            json.dumps(past_feedback)
-            if past_feedback
-            else "No previous feedback available."
-        )
-        logger.debug(f"Retrieved {len(past_feedback)} past feedback items")
-
-        session_id = f"session_{blog_id}"
-        session_service = InMemorySessionService()
-        app_name = "peer_review_agent"
-
-        await session_service.create_session(
-            app_name=app_name, user_id=blog_id, session_id=session_id
-        )
-
-        runner = Runner(
-            agent=peer_review_agent,
-            app_name=app_name,
-            session_service=session_service,
-        )
-
-        review_prompt = f"""Please review the following blog content:
-
-    **Blog Content:**
-    {content}
-
-    **Past Feedback Context:**
-    {past_feedback_text}
-
-    **Source Context:**
-    Use the retrieve_source_context tool to search through the uploaded source documents and verify information against them.
-
-    Provide a comprehensive peer review report following the output schema requirements."""
-
-        logger.info("Executing runner.run_async")
-
-        full_response = ""
-        report = None
-
-        async for event in runner.run_async(
-            user_id=blog_id,
-            session_id=session_id,
-            new_message=genai_types.Content(
-                role="user", parts=[genai_types.Part.from_text(text=review_prompt)]
-            ),
-        ):
-            if event.is_final_response():
-                if event.content and event.content.parts:
-                    full_response = event.content.parts[0].text
-                    logger.debug(
-                        f"Received final response: {len(full_response)} characters"
-                    )
-
-                if hasattr(event, "structured_response") and event.structured_response:
-                    report = event.structured_response
-                    logger.info(
-                        "Successfully received structured PeerReviewReport from agent"
-                    )
-                break
-
-        if not report and not full_response:
-            logger.error("No response received from agent")
-            raise ValueError("Agent did not produce a response")
-
-        if not report:
-            try:
-                response_text = full_response.strip()
-                report_data = json.loads(response_text)
-                report = PeerReviewReport(**report_data)
-                logger.info("Successfully parsed PeerReviewReport from JSON")
-
-            except json.JSONDecodeError as e:
-                logger.error(f"Failed to parse JSON response: {e}")
-                logger.debug(f"Raw response: {full_response}")
-                raise ValueError(f"Agent response was not valid JSON: {e}")
-            except Exception as e:
-                logger.error(f"Error processing review report: {e}")
-                raise
-
-            await asyncio.to_thread(
-                memory_manager.store_review, blog_id, content, report
-            )
-            logger.info(f"Stored review in memory for blog_id: {blog_id}")
-
-        return report
-
-    class PeerReviewer:
-        @staticmethod
-        def review_blog(blog_id: str, content: str) -> PeerReviewReport:
-            """
-            Synchronous convenience method that internally uses asyncio.run.
-            For async applications, prefer using run_peer_review_async directly.
-            """
-            logger.info(f"Using synchronous wrapper for blog_id: {blog_id}")
-            return asyncio.run(run_peer_review_async(blog_id, content))
+    source_manager = get_source_manager()
+    memory_manager = get_memory_manager()
 
     peer_reviewer = PeerReviewer()
 
@@ -147,18 +35,26 @@ def main():
         uploaded_source = st.file_uploader(
             "Upload Source Text (.txt, .md)", type=["txt", "md"]
         )
+        share_source = st.checkbox("Share with all projects", value=False)
         if uploaded_source:
             if st.button("Ingest Source"):
                 try:
                     content = uploaded_source.read().decode("utf-8")
-                    source_manager.add_source(content, uploaded_source.name)
-                    st.success(f"Ingested {uploaded_source.name}")
-                    logger.info(f"User ingested new source: {uploaded_source.name}")
+                    stored = source_manager.add_source(
+                        content,
+                        uploaded_source.name,
+                        blog_id=None if share_source else blog_id,
+                    )
+                    if stored:
+                        st.success(f"Ingested {uploaded_source.name}")
+                        logger.info(f"User ingested new source: {uploaded_source.name}")
+                    else:
+                        st.error(f"Failed to ingest {uploaded_source.name}, see the logs")
                 except Exception as e:
                     st.error(f"Failed to ingest source: {e}")
                     logger.error(f"Source ingestion error: {e}")
 
-        sources = source_manager.list_sources()
+        sources = source_manager.list_sources(blog_id)
         if sources:
             st.write("Available Sources:")
             for s in sources:
@@ -200,6 +96,12 @@ def main():
                 st.subheader("Recommendation")
                 st.write(report.confidential_recommendation)
 
+                if report.budgets_exhausted:
+                    st.warning(
+                        "Review stopped early, budgets exhausted: "
+                        + ", ".join(report.budgets_exhausted)
+                    )
+
                 if report.major_issues:
                     st.subheader("Major Issues")
                     for issue in report.major_issues:
@@ -220,22 +122,16 @@ def main():
                     ]
                     st.table(comment_data)
 
-                with tempfile.NamedTemporaryFile(
-                    delete=False, suffix=".pdf"
-                ) as tmp_file:
-                    try:
-                        generate_pdf(report, tmp_file.name)
-                        with open(tmp_file.name, "rb") as f:
-                            st.download_button(
-                                label="Download PDF Report",
-                                data=f,
-                                file_name=f"review_report_{blog_id}.pdf",
-                                mime="application/pdf",
-                            )
-                        os.unlink(tmp_file.name)
-                    except Exception as e:
-                        st.error(f"Failed to generate PDF: {e}")
-                        logger.error(f"PDF generation failed in app: {e}")
+                try:
+                    st.download_button(
+                        label="Download PDF Report",
+                        data=generate_pdf(report),
+                        file_name=f"review_report_{blog_id}.pdf",
+                        mime="application/pdf",
+                    )
+                except Exception as e:
+                    st.error(f"Failed to generate PDF: {e}")
+                    logger.error(f"PDF generation failed in app: {e}")
 
                 logger.info("Review cycle completed successfully")
 
@@ -0,0 +1,75 @@
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+pytest.importorskip("mem0")
+
+from fastapi.testclient import TestClient
+
+import api
+
+
+class StubSourceManager:
+    def __init__(self, stored=True):
+        self.stored = stored
+        self.added = []
+
+    def add_source(self, content, source_name, blog_id=None):
+        self.added.append((source_name, blog_id))
+        return self.stored
+
+    def list_sources(self, blog_id=None):
+        return [name for name, _ in self.added]
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setitem(api.readiness, "source_manager", True)
+    monkeypatch.setitem(api.readiness, "memory_manager", True)
+    monkeypatch.setattr(api, "get_source_manager", lambda: StubSourceManager())
+    # Without the context manager the lifespan (and its warm-up) does not run.
+    return TestClient(api.app)
+
+
+def test_readyz_reports_missing_resources(client, monkeypatch):
+    assert client.get("/readyz").status_code == 200
+
+    monkeypatch.setitem(api.readiness, "memory_manager", False)
+    response = client.get("/readyz")
+
+    assert response.status_code == 503
+    assert response.json()["resources"] == {"source_manager": True, "memory_manager": False}
+
+
+def test_requests_wait_for_readiness(client, monkeypatch):
+    monkeypatch.setitem(api.readiness, "source_manager", False)
+
+    response = client.get("/sources")
+
+    assert response.status_code == 503
+    assert "Retry-After" in response.headers
+
+
+def test_saturated_limiter_rejects_with_429(client, monkeypatch):
+    monkeypatch.setattr(api.review_limiter, "in_flight", api.review_limiter.limit)
+
+    response = client.post("/reviews", json={"blog_id": "b", "content": "text"})
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == str(api.RETRY_AFTER_SECONDS)
+
+
+def test_add_source(client):
+    response = client.post("/sources", json={"source_name": "a.md", "content": "# A"})
+
+    assert response.status_code == 201
+    assert response.json() == {"source_name": "a.md", "blog_id": None}
+
+
+def test_failed_ingest_is_reported(client, monkeypatch):
+    monkeypatch.setattr(api, "get_source_manager", lambda: StubSourceManager(stored=False))
+
+    response = client.post("/sources", json={"source_name": "a.md", "content": "# A"})
+
+    assert response.status_code == 500
+    assert "a.md" in response.json()["detail"]
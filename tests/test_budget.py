@@ -0,0 +1,137 @@
+import asyncio
+from typing import List
+
+import pytest
+from pydantic import BaseModel
+
+pytest.importorskip("google.adk")
+
+from google.adk.agents import Agent
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_response import LlmResponse
+from google.adk.runners import InMemoryRunner
+from google.adk.tools.agent_tool import AgentTool
+from google.genai import types
+
+from agent.budget import (
+    ReviewBudget,
+    budget_after_model_callback,
+    budget_before_model_callback,
+    budget_before_tool_callback,
+    current_budget,
+)
+from agent.sub_agents.google_search_agent import google_search_agent
+
+
+class ScriptedLlm(BaseLlm):
+    """Replies with `script` in order, repeating the last reply; records each request."""
+
+    script: List[LlmResponse]
+    requests: list = []
+
+    async def generate_content_async(self, llm_request, stream=False):
+        self.requests.append(llm_request)
+        yield self.script[min(len(self.requests), len(self.script)) - 1]
+
+
+def reply(tokens, text=None, call=None):
+    part = types.Part(text=text) if text else types.Part(function_call=call)
+    return LlmResponse(
+        content=types.Content(role="model", parts=[part]),
+        usage_metadata=types.GenerateContentResponseUsageMetadata(total_token_count=tokens),
+    )
+
+
+def search_call():
+    return types.FunctionCall(name="search", args={"request": "q"})
+
+
+class Report(BaseModel):
+    summary: str
+
+
+def tool_names(request):
+    declared = {
+        declaration.name
+        for tool in request.config.tools or []
+        for declaration in tool.function_declarations or []
+    }
+    return declared | set(request.tools_dict)
+
+
+def make_agents(root_script, search_tokens=100, **root_kwargs):
+    search = Agent(
+        name="search",
+        model=ScriptedLlm(model="search", script=[reply(search_tokens, text="found")]),
+        after_model_callback=budget_after_model_callback,
+    )
+    root = Agent(
+        name="root",
+        model=ScriptedLlm(model="root", script=root_script),
+        tools=[AgentTool(search)],
+        before_tool_callback=budget_before_tool_callback,
+        before_model_callback=budget_before_model_callback,
+        after_model_callback=budget_after_model_callback,
+        **root_kwargs,
+    )
+    return root
+
+
+def run(root, budget):
+    async def main():
+        token = current_budget.set(budget)
+        try:
+            runner = InMemoryRunner(agent=root)
+            session = await runner.session_service.create_session(
+                app_name=runner.app_name, user_id="u"
+            )
+            message = types.Content(role="user", parts=[types.Part(text="review")])
+            return [
+                event
+                async for event in runner.run_async(
+                    user_id="u", session_id=session.id, new_message=message
+                )
+            ]
+        finally:
+            current_budget.reset(token)
+
+    return asyncio.run(main())
+
+
+def test_nested_search_tokens_count_against_the_review_budget():
+    budget = ReviewBudget(max_seconds=0)
+    root = make_agents([reply(10, call=search_call()), reply(10, text="report")])
+
+    run(root, budget)
+
+    assert budget.tokens_used == 10 + 100 + 10
+
+
+def test_google_search_agent_reports_its_tokens():
+    assert google_search_agent.after_model_callback is budget_after_model_callback
+
+
+def test_exhausted_budget_removes_the_tools():
+    budget = ReviewBudget(max_seconds=0, max_tokens=50)
+    root = make_agents([reply(10, call=search_call()), reply(10, text="report")])
+
+    run(root, budget)
+
+    first, second = root.model.requests
+    assert "search" in tool_names(first)
+    assert tool_names(second) == set()
+    assert budget.exhausted == ["tokens: 50"]
+
+
+def test_exhausted_budget_keeps_the_report_tool():
+    budget = ReviewBudget(max_seconds=0, max_tokens=50)
+    report_call = types.FunctionCall(name="set_model_response", args={"summary": "ok"})
+    root = make_agents(
+        [reply(10, call=search_call()), reply(10, call=report_call)], output_schema=Report
+    )
+
+    events = run(root, budget)
+
+    assert tool_names(root.model.requests[1]) == {"set_model_response"}
+    assert events[-1].is_final_response()
+    assert '"summary": "ok"' in events[-1].content.parts[0].text
@@ -0,0 +1,23 @@
+import json
+import logging
+import queue
+import sys
+
+from agent.utils.logger import JsonFormatter, LocalQueueHandler
+
+
+def test_queued_records_keep_exc_info_for_the_listener():
+    log_queue = queue.SimpleQueue()
+    handler = LocalQueueHandler(log_queue)
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        record = logging.LogRecord(
+            "test", logging.ERROR, __file__, 1, "failed %s", ("job",), sys.exc_info()
+        )
+    handler.emit(record)
+
+    payload = json.loads(JsonFormatter().format(log_queue.get_nowait()))
+
+    assert payload["message"] == "failed job"
+    assert "ValueError: boom" in payload["exc_info"]
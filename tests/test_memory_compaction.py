@@ -0,0 +1,140 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("mem0")
+
+from agent import memory_compaction
+from agent.memory_compaction import MemoryCompactor
+
+NOW = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+class FakeMemory:
+    def __init__(self, memories, fail_after=None):
+        self.memories = {m["id"]: m for m in memories}
+        self.prompts = []
+        self.fail_after = fail_after
+        self.llm = SimpleNamespace(generate_response=self._generate)
+        self.embedding_model = SimpleNamespace(embed=self._embed)
+        self.vectors = {}
+        self.vector_store = SimpleNamespace(collection=SimpleNamespace(get=self._collection_get))
+
+    def _collection_get(self, include):
+        return {"metadatas": [{"user_id": m["user_id"]} for m in self.memories.values()]}
+
+    def _embed(self, text):
+        # Orthogonal vectors, so no two distinct notes are near-duplicates.
+        index = self.vectors.setdefault(text, len(self.vectors))
+        return [1.0 if i == index else 0.0 for i in range(64)]
+
+    def _generate(self, messages):
+        if self.fail_after is not None and len(self.prompts) >= self.fail_after:
+            raise RuntimeError("llm down")
+        self.prompts.append(messages[-1]["content"])
+        return f"summary #{len(self.prompts)}"
+
+    def get_all(self, user_id, limit=100):
+        return {"results": [m for m in self.memories.values() if m["user_id"] == user_id]}
+
+    def search(self, query, user_id):
+        return {"results": []}
+
+    def delete(self, memory_id):
+        del self.memories[memory_id]
+
+    def add(self, text, user_id, metadata, infer):
+        memory_id = f"s{user_id}{len(self.prompts)}"
+        self.memories[memory_id] = {
+            "id": memory_id,
+            "user_id": user_id,
+            "memory": text,
+            "created_at": NOW.isoformat(),
+            "metadata": metadata,
+        }
+
+
+def make_memory(index, days_old, text=None, user_id="blog", **metadata):
+    return {
+        "id": f"m{user_id}{index}",
+        "user_id": user_id,
+        "memory": text or f"note {index} " + "x" * 90,
+        "created_at": (NOW - timedelta(days=days_old, minutes=index)).isoformat(),
+        "metadata": metadata or None,
+    }
+
+
+def compactor(memory, path=""):
+    manager = SimpleNamespace(
+        memory=memory, chroma_path=str(path), history_db_path=f"{path}/history.db"
+    )
+    return MemoryCompactor(manager)
+
+
+def test_summarizes_long_history_in_chunks(monkeypatch):
+    monkeypatch.setattr(memory_compaction, "SUMMARY_MAX_INPUT_CHARS", 500)
+    memory = FakeMemory([make_memory(i, 100) for i in range(12)])
+
+    stats = compactor(memory).compact_blog("blog", now=NOW)
+
+    assert len(memory.prompts) > 1
+    assert all(len(prompt) <= 500 for prompt in memory.prompts)
+    assert stats["summarized"] == 12
+    assert [m["memory"] for m in memory.memories.values()] == [f"summary #{len(memory.prompts)}"]
+
+
+def test_keeps_memories_that_missed_a_successful_prompt(monkeypatch):
+    monkeypatch.setattr(memory_compaction, "SUMMARY_MAX_INPUT_CHARS", 500)
+    memory = FakeMemory([make_memory(i, 100) for i in range(12)], fail_after=1)
+
+    stats = compactor(memory).compact_blog("blog", now=NOW)
+
+    remaining = [m for m in memory.memories.values() if m["id"].startswith("m")]
+    assert stats["summarized"] + len(remaining) == 12
+    assert 0 < stats["summarized"] < 12
+    # Only memories quoted in the successful prompt are gone.
+    for item in remaining:
+        assert item["memory"] not in memory.prompts[0]
+
+
+def test_merges_existing_summaries():
+    memory = FakeMemory(
+        [
+            make_memory(1, 200, "old summary", type="summary", covers=5),
+            make_memory(2, 150, "older summary", type="summary", covers=3),
+            make_memory(3, 100),
+        ]
+    )
+
+    stats = compactor(memory).compact_blog("blog", now=NOW)
+
+    (summary,) = memory.memories.values()
+    assert summary["metadata"]["covers"] == 9
+    assert "old summary" in memory.prompts[0] and "older summary" in memory.prompts[0]
+    assert stats["after"] == 1
+
+
+def test_summaries_count_towards_the_cap(monkeypatch):
+    monkeypatch.setattr(memory_compaction, "MEMORY_MAX_PER_BLOG", 3)
+    memory = FakeMemory(
+        [make_memory(0, 200, "summary", type="summary", covers=4)]
+        + [make_memory(i, 1) for i in range(1, 5)]
+    )
+
+    stats = compactor(memory).compact_blog("blog", now=NOW)
+
+    assert len(memory.memories) == stats["after"] == 3
+
+
+def test_run_without_blog_ids_compacts_every_blog_in_the_store(tmp_path):
+    memory = FakeMemory(
+        [make_memory(i, 100, user_id="a") for i in range(3)]
+        + [make_memory(i, 1, user_id="b") for i in range(2)]
+    )
+
+    report = compactor(memory, tmp_path).run()
+
+    assert sorted(report["blogs"]) == ["a", "b"]
+    assert report["blogs"]["a"]["before"] == 3
+    assert report["blogs"]["b"]["before"] == 2
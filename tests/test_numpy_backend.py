@@ -0,0 +1,45 @@
+import numpy as np
+
+from agent.vector_stores import numpy_backend
+from agent.vector_stores.numpy_backend import NumpyIndexBackend
+
+
+def test_where_mask_cache_is_bounded_and_current(tmp_path, monkeypatch):
+    monkeypatch.setattr(numpy_backend, "WHERE_MASK_CACHE_SIZE", 4)
+    backend = NumpyIndexBackend(str(tmp_path), "test")
+    vectors = np.eye(3, dtype=np.float32).tolist()
+    backend.add(
+        ["a", "b", "c"], ["a", "b", "c"], vectors, [{"namespace": f"t{i}"} for i in range(3)]
+    )
+
+    for i in range(10):
+        backend.search(vectors[0], k=1, where={"namespace": f"t{i}"})
+    assert len(backend._where_masks) == 4
+
+    backend.delete(ids=["a"])
+    assert backend.search(vectors[0], k=1, where={"namespace": "t0"}) == []
+    assert len(backend._where_masks) == 1
+
+
+def test_filtered_search_on_ivf_index_finds_k_matching_rows(tmp_path):
+    backend = NumpyIndexBackend(str(tmp_path), "test", nprobe=1, ivf_min_rows=100)
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(400, 16)).astype(np.float32)
+    namespaces = [
+        "small" if i % 80 == 0 else "large" if i % 5 == 0 else "shared" for i in range(400)
+    ]
+    backend.add(
+        [f"r{i}" for i in range(400)],
+        [f"row {i}" for i in range(400)],
+        vectors.tolist(),
+        [{"namespace": namespace} for namespace in namespaces],
+    )
+
+    # 5 matching rows: scanned exactly. 80 matching rows: more lists are probed.
+    small = backend.search(vectors[1].tolist(), k=5, where={"namespace": "small"})
+    large = backend.search(vectors[1].tolist(), k=40, where={"namespace": "large"})
+
+    assert backend._ivf is not None
+    assert len(small) == 5
+    assert len(large) == 40
+    assert {hit.metadata["namespace"] for hit in large} == {"large"}
@@ -0,0 +1,133 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("google.adk")
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+from agent.models import router
+from agent.models.router import CircuitBreaker, LatencyStats, ProviderRouter
+
+
+class FakeLlm(BaseLlm):
+    delay: float = 0.0
+    fail: bool = False
+    calls: int = 0
+
+    async def generate_content_async(self, llm_request, stream=False):
+        self.calls += 1
+        llm_request.contents.append(types.Content(role="user", parts=[types.Part(text="x")]))
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError(f"{self.model} down")
+        yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text=self.model)]))
+
+
+def make_router(*llms, min_calls=2, cooldown=0.05):
+    routed = ProviderRouter.from_providers([(llm.model, llm) for llm in llms])
+    for provider in routed.providers:
+        provider.breaker = CircuitBreaker(provider.name, min_calls=min_calls, cooldown=cooldown)
+    return routed
+
+
+def call(routed):
+    request = LlmRequest(
+        model="router", contents=[types.Content(role="user", parts=[types.Part(text="hi")])]
+    )
+
+    async def run():
+        return [response async for response in routed.generate_content_async(request)]
+
+    responses = asyncio.run(run())
+    assert len(request.contents) == 1, "attempts must not mutate the caller's request"
+    return responses[0].content.parts[0].text
+
+
+def open_breaker(breaker):
+    for _ in range(breaker.min_calls):
+        breaker.record(False)
+    assert breaker.state == "open"
+
+
+def test_latency_stats_hedge_delay(monkeypatch):
+    monkeypatch.setattr(router, "MODEL_HEDGE_AFTER_SECONDS", 7.0)
+    monkeypatch.setattr(router, "MODEL_HEDGE_MIN_SAMPLES", 10)
+    stats = LatencyStats(window=100)
+    assert stats.percentile(0.95) is None
+    stats.latencies.extend(range(1, 10))
+    assert stats.hedge_delay() == 7.0
+    stats.latencies.extend(range(10, 101))
+    assert stats.percentile(0.5) == 51
+    assert stats.hedge_delay() == 96
+
+
+def test_circuit_breaker_opens_and_recovers():
+    breaker = CircuitBreaker("p", window=4, min_calls=4, error_rate=0.5, cooldown=0.05)
+    breaker.record(True)
+    breaker.record(False)
+    breaker.record(True)
+    assert breaker.state == "closed"
+    breaker.record(False)
+    assert breaker.state == "open"
+    assert not breaker.available() and not breaker.acquire()
+
+    asyncio.run(asyncio.sleep(0.06))
+    assert breaker.available()
+    assert breaker.acquire() and breaker.state == "half_open"
+    assert not breaker.available() and not breaker.acquire(), "single trial slot"
+    breaker.record(False)
+    assert breaker.state == "open"
+
+    asyncio.run(asyncio.sleep(0.06))
+    assert breaker.acquire()
+    breaker.record(True)
+    assert breaker.state == "closed"
+
+
+def test_fallback_on_failure():
+    primary, fallback = FakeLlm(model="a", fail=True), FakeLlm(model="b")
+    assert call(make_router(primary, fallback)) == "b"
+
+
+def test_all_failing_raises_last_error():
+    routed = make_router(FakeLlm(model="a", fail=True), FakeLlm(model="b", fail=True))
+    with pytest.raises(RuntimeError, match="b down"):
+        call(routed)
+
+
+def test_hedge_wins_over_slow_primary(monkeypatch):
+    monkeypatch.setattr(router, "MODEL_HEDGE_AFTER_SECONDS", 0.05)
+    primary, fallback = FakeLlm(model="a", delay=1.0), FakeLlm(model="b")
+    routed = make_router(primary, fallback)
+    assert call(routed) == "b"
+    stats = routed.stats()
+    assert stats["a"]["hedges_fired"] == 1 and stats["b"]["hedges_won"] == 1
+
+
+def test_open_circuit_is_skipped():
+    primary, fallback = FakeLlm(model="a"), FakeLlm(model="b")
+    routed = make_router(primary, fallback, cooldown=60)
+    open_breaker(routed.providers[0].breaker)
+    assert call(routed) == "b"
+    assert primary.calls == 0
+
+
+def test_unused_half_open_fallback_keeps_its_trial_slot():
+    primary, fallback = FakeLlm(model="a"), FakeLlm(model="b")
+    routed = make_router(primary, fallback)
+    open_breaker(routed.providers[1].breaker)
+    asyncio.run(asyncio.sleep(0.06))
+
+    # The primary serves the call; the half-open fallback must not be consumed.
+    assert call(routed) == "a"
+    assert fallback.calls == 0
+    assert routed.providers[1].breaker.available()
+
+    # When the primary then fails, the recovered fallback gets its trial and closes.
+    primary.fail = True
+    assert call(routed) == "b"
+    assert routed.providers[1].breaker.state == "closed"
@@ -0,0 +1,72 @@
+import asyncio
+import time
+
+import pytest
+
+pytest.importorskip("google.adk")
+
+from google.adk.agents import Agent
+from google.adk.tools.agent_tool import AgentTool
+
+from agent.sub_agents.search_cache import CachedAgentTool, SearchCache
+
+
+@pytest.fixture
+def tool(tmp_path, monkeypatch):
+    runs = []
+
+    async def fake_run(self, *, args, tool_context):
+        runs.append(args["request"])
+        await asyncio.sleep(0.2)
+        return f"answer to {args['request']}"
+
+    monkeypatch.setattr(AgentTool, "run_async", fake_run)
+    cached = CachedAgentTool(
+        Agent(name="search", model="gemini-2.5-flash"),
+        cache=SearchCache(str(tmp_path / "cache.db")),
+    )
+    cached.runs = runs
+    return cached
+
+
+def test_identical_queries_are_coalesced_and_cached(tool):
+    async def run():
+        return await asyncio.gather(
+            tool.run_async(args={"request": "When was Python released?"}, tool_context=None),
+            tool.run_async(args={"request": "when was python released"}, tool_context=None),
+        )
+
+    assert asyncio.run(run()) == ["answer to When was Python released?"] * 2
+    assert len(tool.runs) == 1
+    asyncio.run(tool.run_async(args={"request": "When was Python released"}, tool_context=None))
+    assert len(tool.runs) == 1
+
+
+def test_cancelled_leader_does_not_cancel_waiters(tool):
+    async def run():
+        async def leader():
+            async with asyncio.timeout(0.05):
+                await tool.run_async(args={"request": "q"}, tool_context=None)
+
+        leading = asyncio.create_task(leader())
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(tool.run_async(args={"request": "q"}, tool_context=None))
+        with pytest.raises(TimeoutError):
+            await leading
+        return await waiter
+
+    assert asyncio.run(run()) == "answer to q"
+    assert len(tool.runs) == 2
+
+
+def test_purge_expired(tmp_path):
+    cache = SearchCache(str(tmp_path / "cache.db"))
+    cache.put("old", "old", "stale", ttl=-1)
+    cache.put("new", "new", "fresh", ttl=60)
+    assert cache.get("old") is None
+    assert cache.purge_expired() == 0, "the first put already swept expired rows"
+    assert cache._conn.execute("SELECT COUNT(*) FROM search_cache").fetchone()[0] == 1
+    cache.put("old2", "old2", "stale", ttl=-1)
+    cache._last_purge = time.time() - 10**6
+    cache.put("new2", "new2", "fresh", ttl=60)
+    assert cache._conn.execute("SELECT COUNT(*) FROM search_cache").fetchone()[0] == 2
@@ -0,0 +1,51 @@
+import pytest
+
+pytest.importorskip("langchain_text_splitters")
+
+from agent.chunking import StructureAwareTextSplitter
+
+
+def split(text, chunk_size=1000):
+    splitter = StructureAwareTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=0,
+        length_function=lambda text: len(text.split()),
+    )
+    return splitter.split_text(text)
+
+
+def test_chunks_carry_the_heading_path():
+    chunks = split("# Guide\n\nIntro.\n\n## Install\n\n### Linux\n\nUse apt.\n\n## Usage\n\nRun it.")
+
+    assert chunks == [
+        "# Guide\n\nIntro.",
+        "# Guide\n## Install\n### Linux\n\nUse apt.",
+        "# Guide\n## Usage\n\nRun it.",
+    ]
+
+
+def test_keeps_headings_without_body():
+    chunks = split("# Guide\n\n## Empty\n\n## Usage\n\nRun it.\n\n## Trailing")
+
+    assert chunks == [
+        "# Guide\n## Empty",
+        "# Guide\n## Usage\n\nRun it.",
+        "# Guide\n## Trailing",
+    ]
+
+
+def test_lists_and_tables_keep_line_breaks():
+    text = "Steps:\n- install\n  - with pip\n- run\n\n| a | b |\n|---|---|\n| 1 | 2 |"
+
+    assert split(text) == [
+        "Steps:\n- install\n  - with pip\n- run\n\n| a | b |\n|---|---|\n| 1 | 2 |"
+    ]
+
+
+def test_oversized_table_repeats_its_header():
+    rows = "\n".join(f"| row {i} | value {i} |" for i in range(6))
+    chunks = split(f"| name | value |\n|---|---|\n{rows}", chunk_size=20)
+
+    assert len(chunks) > 1
+    for chunk in chunks:
+        assert chunk.startswith("| name | value |\n|---|---|\n| row")
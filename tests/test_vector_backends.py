@@ -0,0 +1,109 @@
+"""Conformance tests every vector store backend must pass; SourceManager relies on them."""
+
+import numpy as np
+import pytest
+
+from agent.vector_stores import get_backend
+
+VECTORS = np.eye(4, dtype=np.float32)
+
+
+@pytest.fixture(params=["chroma", "numpy"])
+def make_backend(request, tmp_path):
+    if request.param == "chroma":
+        pytest.importorskip("chromadb")
+    return lambda: get_backend(str(tmp_path), "test", backend=request.param)
+
+
+@pytest.fixture
+def backend(make_backend):
+    backend = make_backend()
+    backend.add(
+        ids=["a0", "a1", "b0", "c0"],
+        texts=["alpha zero", "alpha one", "beta zero", "gamma zero"],
+        embeddings=VECTORS.tolist(),
+        metadatas=[
+            {"source": "a.md", "chunk_index": 0},
+            {"source": "a.md", "chunk_index": 1},
+            {"source": "b.md", "chunk_index": 0},
+            {"source": "c.md", "chunk_index": 0},
+        ],
+    )
+    return backend
+
+
+def test_search_orders_by_distance(backend):
+    assert backend.count() == 4
+
+    hits = backend.search(VECTORS[2].tolist(), k=2)
+
+    assert hits[0].id == "b0"
+    assert hits[0].distance < hits[1].distance
+    assert abs(hits[0].distance) < 1e-4
+
+
+def test_search_batch_keeps_query_order(backend):
+    batch = backend.search_batch(VECTORS[:2].tolist(), k=1)
+
+    assert [hits[0].id for hits in batch] == ["a0", "a1"]
+
+
+def test_where_filters(backend):
+    scoped = backend.search(VECTORS[2].tolist(), k=4, where={"source": "a.md"})
+    assert {hit.id for hit in scoped} == {"a0", "a1"}
+
+    scoped = backend.search(VECTORS[0].tolist(), k=4, where={"source": {"$in": ["b.md", "c.md"]}})
+    assert {hit.id for hit in scoped} == {"b0", "c0"}
+
+
+def test_list_sources_and_get_by_source(backend):
+    assert backend.list_sources() == ["a.md", "b.md", "c.md"]
+    assert [r.text for r in backend.get_by_source("a.md")] == ["alpha zero", "alpha one"]
+
+
+def test_add_ignores_existing_ids(backend):
+    backend.add(["a0"], ["duplicate"], [VECTORS[3].tolist()], [{"source": "x.md"}])
+
+    assert backend.count() == 4
+    assert backend.get_by_source("a.md")[0].text == "alpha zero"
+
+
+def test_upsert_replaces_in_place(backend):
+    backend.upsert(
+        ["a0"], ["alpha replaced"], [VECTORS[3].tolist()], [{"source": "a.md", "chunk_index": 0}]
+    )
+
+    assert backend.count() == 4
+    assert backend.search(VECTORS[3].tolist(), k=2)[0].id in {"a0", "c0"}
+    assert backend.get_by_source("a.md")[0].text == "alpha replaced"
+
+
+def test_failed_upsert_keeps_the_old_row(backend):
+    with pytest.raises(Exception):
+        backend.upsert(["a0"], ["wrong dim"], [[1.0, 0.0]], [{"source": "a.md"}])
+
+    assert backend.count() == 4
+    assert backend.get_by_source("a.md")[0].text == "alpha zero"
+
+
+def test_update_and_backfill_metadata(backend):
+    backend.update_metadata(["c0"], [{"source": "c.md", "chunk_index": 0, "namespace": "t1"}])
+
+    assert [r.id for r in backend.get({"namespace": "t1"})] == ["c0"]
+    assert backend.backfill_metadata("namespace", "shared") == 3
+    assert backend.get_by_source("a.md", where={"namespace": "shared"})
+
+
+def test_delete_by_id_and_where(backend):
+    backend.delete(ids=["b0"])
+    assert backend.count() == 3
+
+    backend.delete(where={"source": "a.md"})
+    assert backend.list_sources() == ["c.md"]
+    assert [hit.id for hit in backend.search(VECTORS[0].tolist(), k=5)] == ["c0"]
+
+
+def test_state_persists_across_reopen(backend, make_backend):
+    backend.delete(ids=["b0"])
+
+    assert make_backend().count() == 3